@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+"""Benchmark the scope-routing proxy against local stub backends.
+
+Start one stub image service per cloud, the `OidProxy` in front of them, and
+then a closed loop of clients that send requests to CloudOne scoped on
+CloudTwo over keep-alive connections:
+
+> python misc/proxy-bench.py --clouds 2 --clients 32 --duration 10
+
+Pass `--direct` to target the stub backend without the proxy (baseline).
+
+"""
+
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from openstackoid.interpreter import Service, get_interpreter_from_services
+from openstackoid.proxy import OidProxy
+
+
+BODY = json.dumps({"images": [{"id": "1", "name": "cirros"}]}).encode()
+RESPONSE = (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY))
+
+
+async def stub_backend(reader, writer):
+    """Answer any request with a fixed image list (keep-alive)."""
+
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    await reader.readexactly(int(line.split(b":")[1]))
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def client(port, request, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(request)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(int(line.split(b":")[1])
+                      for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:"))
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def bench(options):
+    clouds = [f"Cloud{i}" for i in range(options.clouds)]
+    backends = [await asyncio.start_server(stub_backend, "127.0.0.1", 0)
+                for _ in clouds]
+    ports = [b.sockets[0].getsockname()[1] for b in backends]
+    services = [Service("image", c, f"http://127.0.0.1:{p}/image", "public")
+                for c, p in zip(clouds, ports)]
+
+    proxy = OidProxy(get_interpreter_from_services(services))
+    server = await proxy.serve("127.0.0.1", 0)
+    target = ports[-1] if options.direct \
+        else server.sockets[0].getsockname()[1]
+
+    scope = json.dumps({"image": clouds[-1]})
+    request = (f"GET /image/v2/images HTTP/1.1\r\n"
+               f"Host: 127.0.0.1:{ports[0]}\r\n"
+               f"X-Scope: {scope}\r\n\r\n").encode()
+
+    latencies = []
+    deadline = time.perf_counter() + options.duration
+    await asyncio.gather(*(client(target, request, deadline, latencies)
+                           for _ in range(options.clients)))
+
+    latencies.sort()
+    print(f"{len(latencies) / options.duration:.0f} requests/s, latency "
+          f"median {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+    proxy.pool.close()
+    for s in backends + [server]:
+        s.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--clouds", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--direct", action="store_true",
+                        help="bypass the proxy")
+    options = parser.parse_args()
+    asyncio.get_event_loop().run_until_complete(bench(options))
+
+
+if __name__ == "__main__":
+    main()
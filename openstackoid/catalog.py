@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from dataclasses import astuple, dataclass
+from os import path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from urllib import parse
+
+import argparse
+import json
+import logging
+import marshal
+import mmap
+import os
+import sqlite3
+import threading
+
+from .configuration import CATALOG_MISS_CACHE_SIZE
+from .utils import LRUCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Header of a binary snapshot of the catalog: a magic string, the version of
+# the snapshot format and the version of the marshal format.
+SNAPSHOT_MAGIC = b"OIDCATALOG"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION, marshal.version])
+
+
+# Schema of a SQLite catalog. The position of a service keeps the order of the
+# services list, for first-match lookups.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS services (
+    position INTEGER PRIMARY KEY,
+    service_type TEXT NOT NULL,
+    cloud TEXT NOT NULL,
+    url TEXT NOT NULL,
+    interface TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS services_by_key
+    ON services (service_type, interface, cloud, position);
+CREATE INDEX IF NOT EXISTS services_by_url ON services (url, position);
+"""
+
+
+@dataclass
+class Service:
+    service_type: str
+    cloud: str
+    url: str
+    interface: str
+
+
+def _oss2services(services: List[Dict[str, str]]) -> List[Service]:
+    """Transform a list of OpenStack services into a list of type `Service`.
+
+    A list of OpenStack services may be obtained with:
+
+    > openstack endpoint list --format json \
+      -c "Service Type" -c "Interface" -c "URL" -c "Region"
+
+    And then transformed into a python `dict` with `json.load`.
+
+    """
+
+    return [Service(service_type=s["Service Type"],
+                    cloud=s["Region"],
+                    url=s["URL"],
+                    interface=s["Interface"])
+            for s in services]
+
+
+class ServiceCatalog:
+    """Indexed (read-only) view of a list of `Service`.
+
+    The catalog is built once from a list of services and then only read. It
+    keeps two indexes that preserve the first-match semantics of a linear scan
+    over the list of services:
+
+    - a hash index keyed by (service_type, interface, cloud), and
+    - an URL index keyed by the URL of each service, probed with the prefixes
+      of a requested URL whose length matches a known service URL length.
+
+    URLs that match no service (e.g., Keystone discovery or third-party
+    endpoints) are kept in a bounded negative cache. Since only the prefixes
+    up to the longest service URL are probed, a miss is cached for every URL
+    sharing these first characters. The cache is per catalog, so a reloaded
+    catalog starts with an empty one. The cache is consulted before the
+    indexes, so a known miss costs a single probe.
+
+    """
+
+    def __init__(self, services: List[Service]):
+        self.services = services
+
+        # Only the first service of a given key is indexed (first-match)
+        self._by_key: Dict[Tuple[str, str, str], Service] = {}
+        self._by_url: Dict[str, Tuple[int, Service]] = {}
+        for position, service in enumerate(services):
+            key = (service.service_type, service.interface, service.cloud)
+            self._by_key.setdefault(key, service)
+            self._by_url.setdefault(service.url, (position, service))
+
+        # Distinct lengths of the indexed URLs, in ascending order
+        self._url_lengths: List[int] = sorted(
+            {len(url) for url in self._by_url})
+        self.misses = LRUCache(maxsize=CATALOG_MISS_CACHE_SIZE)
+
+    def __len__(self) -> int:
+        return len(self.services)
+
+    def close(self) -> None:
+        """Release the resources held by the catalog."""
+
+        pass
+
+    def find(self, service_type: str, interface: str,
+             cloud: str) -> Optional[Service]:
+        """Find the first `Service` of a type/interface in a cloud."""
+
+        return self._by_key.get((service_type, interface, cloud))
+
+    def find_by_url(self, url: str) -> Optional[Service]:
+        """Find the first `Service` whose URL is a prefix of `url`."""
+
+        key = url[:self._url_lengths[-1]] if self._url_lengths else ""
+        if self.misses.get(key):
+            return None
+
+        service = self._find_by_url(url)
+        if service is None:
+            self.misses.set(key, True)
+
+        return service
+
+    def _find_by_url(self, url: str) -> Optional[Service]:
+        found: Optional[Tuple[int, Service]] = None
+        for length in self._url_lengths:
+            if length > len(url):
+                break
+
+            candidate = self._by_url.get(url[:length])
+            if candidate and (not found or candidate[0] < found[0]):
+                found = candidate
+
+        return found[1] if found else None
+
+
+class SqliteServiceCatalog(ServiceCatalog):
+    """Catalog of services stored in a SQLite database.
+
+    Lookups are indexed queries on the database (see `SQLITE_SCHEMA`), so
+    opening the catalog does not load the services. The list of services is
+    only loaded when `services` is accessed.
+
+    The connection to the database is released with `close`. A lookup that
+    still holds the catalog afterwards (e.g., during a reload) reopens it.
+
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._services: Optional[List[Service]] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._url_lengths = [length for length, in self._query(
+            "SELECT DISTINCT length(url) FROM services ORDER BY 1")]
+        self.misses = LRUCache(maxsize=CATALOG_MISS_CACHE_SIZE)
+
+    def _query(self, query: str, parameters: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            if self._connection is None:
+                self._connection = sqlite3.connect(
+                    f"file:{self.db_path}?mode=ro", uri=True,
+                    check_same_thread=False)
+            return self._connection.execute(query, parameters).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @property
+    def services(self) -> List[Service]:
+        if self._services is None:
+            self._services = [Service(*row) for row in self._query(
+                "SELECT service_type, cloud, url, interface FROM services "
+                "ORDER BY position")]
+
+        return self._services
+
+    def __len__(self) -> int:
+        (count,), = self._query("SELECT count(*) FROM services")
+        return count
+
+    def find(self, service_type: str, interface: str,
+             cloud: str) -> Optional[Service]:
+        rows = self._query(
+            "SELECT service_type, cloud, url, interface FROM services "
+            "WHERE service_type = ? AND interface = ? AND cloud = ? "
+            "ORDER BY position LIMIT 1", (service_type, interface, cloud))
+        return Service(*rows[0]) if rows else None
+
+    def _find_by_url(self, url: str) -> Optional[Service]:
+        prefixes = tuple(url[:length] for length in self._url_lengths
+                         if length <= len(url))
+        if not prefixes:
+            return None
+
+        rows = self._query(
+            "SELECT service_type, cloud, url, interface FROM services "
+            f"WHERE url IN ({', '.join('?' * len(prefixes))}) "
+            "ORDER BY position LIMIT 1", prefixes)
+        return Service(*rows[0]) if rows else None
+
+
+def _get_catalog_path(url: str) -> str:
+    uri = parse.urlparse(url)
+    return path.abspath(''.join([uri.netloc, uri.path]))
+
+
+def _load_json_services(file_path: str) -> List[Service]:
+    with open(file_path, 'r') as json_file:
+        return _oss2services(json.load(json_file))
+
+
+def _load_snapshot_services(file_path: str) -> List[Service]:
+    with open(file_path, 'rb') as snapshot_file, \
+         mmap.mmap(snapshot_file.fileno(), 0,
+                   access=mmap.ACCESS_READ) as snapshot:
+        if snapshot[:len(SNAPSHOT_HEADER)] != SNAPSHOT_HEADER:
+            raise ValueError(f"{file_path} is not a catalog snapshot "
+                             f"(version {SNAPSHOT_VERSION})")
+
+        with memoryview(snapshot)[len(SNAPSHOT_HEADER):] as view:
+            rows = marshal.loads(view)
+
+    return [Service(*row) for row in rows]
+
+
+def load_services(url: str) -> List[Service]:
+    """Load the list of services from an abstract path.
+
+    The `url` is the path to the services list. In absence of scheme, the
+    default one is `file://`. The scheme selects the format of the services
+    list:
+
+    - `file://` a json file (output of `openstack endpoint list`),
+    - `sqlite://` a SQLite database (see `write_sqlite_catalog`),
+    - `snapshot://` a binary snapshot (see `write_snapshot_catalog`).
+
+    """
+
+    scheme = parse.urlparse(url).scheme or "file"
+    file_path = _get_catalog_path(url)
+    if scheme == "file":
+        services = _load_json_services(file_path)
+    elif scheme == "sqlite":
+        catalog = SqliteServiceCatalog(file_path)
+        services = catalog.services
+        catalog.close()
+    elif scheme == "snapshot":
+        services = _load_snapshot_services(file_path)
+    else:
+        raise ValueError(f"Unsupported catalog scheme: {scheme}")
+
+    logger.debug(f"Load from {url} the services: {services}")
+    return services
+
+
+def load_catalog(url: str) -> ServiceCatalog:
+    """Load the `ServiceCatalog` from an abstract path.
+
+    See `load_services` for the supported schemes. A `sqlite://` catalog is not
+    loaded in memory, lookups are performed on the database.
+
+    """
+
+    if parse.urlparse(url).scheme == "sqlite":
+        return SqliteServiceCatalog(_get_catalog_path(url))
+
+    return ServiceCatalog(load_services(url))
+
+
+def write_sqlite_catalog(services: List[Service], db_path: str) -> None:
+    """Write the list of `services` into a (new) SQLite catalog."""
+
+    with sqlite3.connect(db_path) as connection:
+        connection.executescript(SQLITE_SCHEMA)
+        connection.execute("DELETE FROM services")
+        connection.executemany(
+            "INSERT INTO services (position, service_type, cloud, url, "
+            "interface) VALUES (?, ?, ?, ?, ?)",
+            ((position,) + astuple(service)
+             for position, service in enumerate(services)))
+    connection.close()
+
+
+def write_snapshot_catalog(services: List[Service], file_path: str) -> None:
+    """Write the list of `services` into a binary snapshot."""
+
+    rows = tuple(astuple(service) for service in services)
+    with open(file_path, 'wb') as snapshot_file:
+        snapshot_file.write(SNAPSHOT_HEADER)
+        snapshot_file.write(marshal.dumps(rows))
+
+
+def get_catalog_version(url: str) -> Optional[Hashable]:
+    """Get a value that changes whenever the catalog at `url` changes.
+
+    Returns `None` if the catalog cannot be reached.
+
+    """
+
+    try:
+        stat = os.stat(_get_catalog_path(url))
+    except OSError:
+        return None
+
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class CatalogWatcher(threading.Thread):
+    """Watch the source of a catalog and reload it when it changes.
+
+    The watcher polls the version of the catalog (see `get_catalog_version`)
+    every `interval` seconds. On a change, it loads the services and builds a
+    new `ServiceCatalog` in its own thread, i.e., off the request path, and then
+    hands it to `on_change`. A catalog that fails to load is ignored (the
+    current one is kept) until its next change.
+
+    """
+
+    def __init__(self, url: str,
+                 on_change: Callable[[ServiceCatalog], None],
+                 interval: float,
+                 version: Optional[Hashable] = None):
+        super().__init__(name="oid-catalog-watcher", daemon=True)
+        self.url = url
+        self.on_change = on_change
+        self.interval = interval
+        self.version = version
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def check(self) -> bool:
+        """Reload the catalog if it changed since the last check.
+
+        Returns `True` if a new catalog has been handed to `on_change`.
+
+        """
+
+        version = get_catalog_version(self.url)
+        if version is None or version == self.version:
+            return False
+
+        self.version = version
+        try:
+            catalog = load_catalog(self.url)
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            logger.error(f"Cannot reload the catalog from {self.url}: {e}")
+            return False
+
+        logger.info(f"Reload the catalog from {self.url} "
+                    f"({len(catalog)} services)")
+        self.on_change(catalog)
+        return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Convert a catalog of services from a format to another one.
+
+    E.g., generate the binary snapshot of a json catalog with:
+
+    > python -m openstackoid.catalog file:///etc/openstackoid/catalog.json \
+      snapshot:///etc/openstackoid/catalog.snapshot
+
+    """
+
+    parser = argparse.ArgumentParser(description=main.__doc__.split("\n")[0])
+    parser.add_argument("source", help="url of the catalog to convert")
+    parser.add_argument("target",
+                        help="url of the sqlite:// or snapshot:// catalog")
+    options = parser.parse_args(argv)
+
+    services = load_services(options.source)
+    target_path = _get_catalog_path(options.target)
+    scheme = parse.urlparse(options.target).scheme
+    if scheme == "sqlite":
+        write_sqlite_catalog(services, target_path)
+    elif scheme == "snapshot":
+        write_snapshot_catalog(services, target_path)
+    else:
+        parser.error(f"Unsupported target scheme: {scheme}")
+
+
+if __name__ == "__main__":
+    main()
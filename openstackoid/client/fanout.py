@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from typing import Callable, Optional, Tuple
+
+import functools
+import logging
+
+from ..configuration import get_execution_scope
+from ..dispatcher import OidDispatcher, scope
+from ..interpreter import OidInterpreter
+from .lister import lister_args_xfm_func, merge_lister_results
+
+
+logger = logging.getLogger(__name__)
+
+
+# Name of the column holding the cloud of each row of a fanned out command.
+CLOUD_COLUMN = "Cloud"
+
+
+def make_extr_scp_func(service_type: str) -> Callable[..., Optional[Tuple]]:
+    """Make the function extracting the scope of a `service_type` command.
+
+    See, e.g., `image.image_list_extr_scp_func`: the scope is collected from
+    the command line options of the command passed to `take_action`.
+
+    """
+
+    def extr_scp_func(interpreter: OidInterpreter,
+                      *arguments, **keywords) -> Optional[Tuple]:
+        context = arguments[0]
+        shell_scope = context.app.options.oid_scope
+        service_scope = shell_scope[service_type]
+        logger.info(f"Service scope: '{service_scope}'")
+        return service_type, service_scope
+
+    return extr_scp_func
+
+
+def add_cloud_column(func: Callable, lister: bool = True) -> Callable:
+    """Add the `CLOUD_COLUMN` to the results of a command.
+
+    The cloud is the endpoint of the execution scope in which `func` is
+    executed. The `func` is the `take_action` of a `osc_lib.command.Lister` (a
+    cloud per row) or, if not `lister`, of a `osc_lib.command.ShowOne`.
+
+    """
+
+    @functools.wraps(func)
+    def wrapper(*arguments, **keywords):
+        columns, data = func(*arguments, **keywords)
+        cloud = get_execution_scope()[1]
+        columns = tuple(columns) + (CLOUD_COLUMN,)
+        if lister:
+            return columns, (tuple(row) + (cloud,) for row in data)
+
+        return columns, tuple(data) + (cloud,)
+
+    return wrapper
+
+
+def fanout_lister_conj_res_func(
+        this: OidDispatcher, other: OidDispatcher) -> OidDispatcher:
+    """Aggregate results of the 'and' operator for a Lister command.
+
+    Rows of every cloud are merged lazily and yielded as clouds answer (see
+    `lister.MergedRows`), but not de-duplicated: two clouds may have distinct
+    resources of the same ID.
+
+    """
+
+    other.result = merge_lister_results(this, other, unique=False)
+
+    return other
+
+
+def fanout_show_one_conj_res_func(
+        this: OidDispatcher, other: OidDispatcher) -> OidDispatcher:
+    """Aggregate results of the 'and' operator for a ShowOne command.
+
+    The value of a column is the list of the values of each cloud, one per
+    line, so they line up with the `CLOUD_COLUMN`. A column missing in a cloud
+    gets an empty line.
+
+    """
+
+    def padding(values: dict) -> str:
+        # One empty line per cloud already merged in `values`
+        return "\n" * str(values[CLOUD_COLUMN]).count("\n")
+
+    if this.result and other.result:
+        this_columns, this_data = this.result
+        other_columns, other_data = other.result
+        these = dict(zip(this_columns, this_data))
+        others = dict(zip(other_columns, other_data))
+        columns = tuple(this_columns) + tuple(
+            c for c in other_columns if c not in these)
+        data = tuple(f"{these.get(c, padding(these))}\n"
+                     f"{others.get(c, padding(others))}"
+                     for c in columns)
+        other.result = (columns, data)
+
+    return other
+
+
+def _fanout_scope(service_type: str, interpreter: OidInterpreter,
+                  lister: bool, conj_res_func: Callable,
+                  **keywords) -> Callable:
+    keywords.setdefault("conj_parallel", True)
+    scoped = scope(interpreter,
+                   extr_scp_func=make_extr_scp_func(service_type),
+                   conj_res_func=conj_res_func,
+                   **keywords)
+    return lambda func: scoped(add_cloud_column(func, lister=lister))
+
+
+def lister_scope(service_type: str, interpreter: OidInterpreter,
+                 **keywords) -> Callable:
+    """Scope decorator to fan a Lister command out to the clouds of a scope.
+
+    The `take_action` of the command is executed on every cloud of a '&'
+    scope concurrently, the `CLOUD_COLUMN` is added to its rows, and the rows
+    of the clouds are merged lazily. Keywords are passed to `scope`, e.g.,
+    `conj_parallel=False` executes the clouds one after the other.
+
+    """
+
+    keywords.setdefault("args_xfm_func", lister_args_xfm_func)
+    return _fanout_scope(service_type, interpreter, True,
+                         fanout_lister_conj_res_func, **keywords)
+
+
+def show_one_scope(service_type: str, interpreter: OidInterpreter,
+                   **keywords) -> Callable:
+    """Scope decorator to fan a ShowOne command out to the clouds of a scope.
+
+    See `lister_scope` and `fanout_show_one_conj_res_func`.
+
+    """
+
+    return _fanout_scope(service_type, interpreter, False,
+                         fanout_show_one_conj_res_func, **keywords)
+
+
+# Partial functions of the scope decorator for common list operations, e.g.:
+#
+# @server_list_scope(interpreter)
+# def take_action(self, parsed_args):
+#     ...
+server_list_scope = functools.partial(lister_scope, "compute")
+flavor_list_scope = functools.partial(lister_scope, "compute")
+network_list_scope = functools.partial(lister_scope, "network")
+volume_list_scope = functools.partial(lister_scope, "volumev3")
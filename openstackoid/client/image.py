@@ -10,11 +10,11 @@
 from typing import Optional, Tuple
 
 import functools
-import itertools
 import logging
 
 from ..dispatcher import OidDispatcher, scope
 from ..interpreter import OidInterpreter
+from .lister import lister_args_xfm_func, merge_lister_results
 
 
 SERVICE_TYPE = "image"
@@ -45,24 +45,30 @@ def image_list_conj_res_func(
     """Aggregate results of the 'and' operator for the 'image list' command.
 
     Apply the aggregation after execution of the command with a compound, and
-    conjunctive scope by merging the list of each endpoint.
+    conjunctive scope by merging the list of each endpoint. The lists are
+    merged lazily on the `--sort` key, de-duplicated by ID and limited to
+    `--limit` images overall (see `lister.MergedRows`). Images are yielded as
+    endpoints answer, in arrival order unless there is a `--sort` key. Thus,
+    an endpoint that failed does not fail the aggregation: its exception is
+    raised while the images are listed, possibly after images of other
+    endpoints have been printed. The listing ends as soon as `--limit` images
+    arrived, without waiting for slower endpoints.
 
     In terms of the OS client (thought the cliff library) this is a wrapper for
     a `osc_lib.command.Lister` instance.
 
     """
 
-    if this.result and other.result:
-        aggregated_labels = other.result[0]
-        this_generator = this.result[1]
-        other_generator = other.result[1]
-        aggregated_results = itertools.chain(this_generator, other_generator)
-        other.result = (aggregated_labels, aggregated_results)
+    other.result = merge_lister_results(this, other)
 
     return other
 
 
 # Partial function of the scope decorator for the 'image list' operation.
+# The endpoints of a conjunction are all queried concurrently, so the merge
+# only waits for the first one to answer.
 image_list_scope = functools.partial(scope,
                                      extr_scp_func=image_list_extr_scp_func,
-                                     conj_res_func=image_list_conj_res_func)
+                                     args_xfm_func=lister_args_xfm_func,
+                                     conj_res_func=image_list_conj_res_func,
+                                     conj_parallel=True)
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from concurrent.futures import FIRST_COMPLETED, Future, as_completed, wait
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple)
+
+import copy
+import heapq
+import itertools
+import logging
+
+from ..dispatcher import OidDispatcher, get_executor, in_worker
+from ..interpreter import OidInterpreter
+
+
+logger = logging.getLogger(__name__)
+
+
+# Separators of a per-cloud marker, e.g., "CloudOne=<id>,CloudTwo=<id>".
+MARKER_SEPARATOR = ","
+MARKER_CLOUD_SEPARATOR = "="
+
+
+Row = Tuple[Any, ...]
+
+
+def _normalize(name: str) -> str:
+    return name.lower().replace("_", " ").strip()
+
+
+def parse_sort(sort: Optional[str],
+               columns: Sequence[str]) -> Tuple[List[int], bool]:
+    """Get the indexes of the sort columns of a `--sort` option.
+
+    The `sort` is the value of the `--sort` option of a list command (e.g.,
+    "name:asc,status:desc"), so rows are already sorted by each cloud. Keys
+    are matched with `columns` regardless of the case (e.g., "name" and
+    "Name"). Only the leading keys sharing the direction of the first one are
+    kept, and up to the first key that is not a column.
+
+    Returns the indexes of the sort columns and whether they are in descending
+    order.
+
+    """
+
+    indexes: List[int] = []
+    reverse = False
+    names = [_normalize(c) for c in columns]
+    for position, key in enumerate((sort or "").split(",")):
+        name, _, direction = key.partition(":")
+        descending = direction.strip().lower() == "desc"
+        if position == 0:
+            reverse = descending
+        if descending != reverse or _normalize(name) not in names:
+            break
+        indexes.append(names.index(_normalize(name)))
+
+    return indexes, reverse
+
+
+def parse_marker(marker: Optional[str]) -> Dict[str, str]:
+    """Split a per-cloud marker into the marker of each cloud."""
+
+    if not marker or MARKER_CLOUD_SEPARATOR not in marker:
+        return {}
+
+    return dict(m.split(MARKER_CLOUD_SEPARATOR, 1)
+                for m in marker.split(MARKER_SEPARATOR) if m)
+
+
+def format_marker(markers: Dict[str, str]) -> str:
+    return MARKER_SEPARATOR.join(f"{cloud}{MARKER_CLOUD_SEPARATOR}{marker}"
+                                 for cloud, marker in sorted(markers.items()))
+
+
+class MergedRows:
+    """Rows of the Lister results of several clouds, merged lazily.
+
+    The `parts` are the pending results (`columns`, `rows`) of each cloud, so
+    rows are yielded as clouds answer. In `arrival` order, the rows of a cloud
+    are yielded as soon as it has answered, and the first row only waits for
+    the fastest cloud. Otherwise, rows of every cloud are sorted by the same
+    columns (`sort_indexes`, `reverse`), so they are merged with a k-way merge
+    without being collected first. Without sort columns, the rows of each
+    cloud follow each other in the order of the scope.
+
+    The exception of a cloud that failed is raised when its rows are reached,
+    i.e., possibly after rows of other clouds have been yielded.
+
+    Rows already seen (same value in the `id_index` column) are skipped if
+    `unique` is set, and the merge stops after `limit` rows, without waiting
+    for (or failing on) the clouds whose rows are not needed. The iteration
+    computes `next_marker`, the per-cloud marker of the next page (see
+    `parse_marker`), from the `markers` of the current page and the last row
+    of each cloud that has been consumed.
+
+    """
+
+    def __init__(self, parts: List[Tuple[str, Future]],
+                 sort_indexes: Sequence[int] = (),
+                 reverse: bool = False,
+                 id_index: Optional[int] = None,
+                 limit: Optional[int] = None,
+                 markers: Optional[Dict[str, str]] = None,
+                 unique: bool = True,
+                 arrival: bool = False):
+        self.parts = parts
+        self.sort_indexes = list(sort_indexes)
+        self.reverse = reverse
+        self.id_index = id_index
+        self.limit = limit
+        self.markers = dict(markers or {})
+        self.unique = unique
+        self.arrival = arrival
+        self.next_marker: Optional[str] = None
+
+    def _sort_key(self, entry: Tuple[str, Row]) -> Tuple:
+        row = entry[1]
+        # None values are kept apart to not compare them with others
+        return tuple((row[i] is None, row[i]) for i in self.sort_indexes)
+
+    @staticmethod
+    def _rows(source: Future) -> Iterable[Row]:
+        result = source.result()
+        return result[1] if result else ()
+
+    def _stream(self, cloud: str, source: Future) -> Iterator[Tuple[str, Row]]:
+        return zip(itertools.repeat(cloud), self._rows(source))
+
+    def _arrivals(self) -> Iterator[Tuple[str, Row]]:
+        clouds = {source: cloud for cloud, source in self.parts}
+        # Clouds that already answered come first, in the order of the scope
+        pending = []
+        for cloud, source in self.parts:
+            if source.done():
+                yield from self._stream(cloud, source)
+            else:
+                pending.append(source)
+
+        for source in as_completed(pending):
+            yield from self._stream(clouds[source], source)
+
+    def _entries(self) -> Iterator[Tuple[str, Row]]:
+        if self.arrival:
+            return self._arrivals()
+
+        streams = (self._stream(cloud, source) for cloud, source in self.parts)
+        if not self.sort_indexes:
+            return itertools.chain.from_iterable(streams)
+
+        return heapq.merge(*streams, key=self._sort_key, reverse=self.reverse)
+
+    def __iter__(self) -> Iterator[Row]:
+        markers = dict(self.markers)
+        seen = set()
+        count = 0
+        # No entry is pulled once the limit is met: the next one may wait for
+        # the slowest cloud, or raise the error of a failed one
+        entries = self._entries() \
+            if self.limit is None or self.limit > 0 else iter(())
+        for cloud, row in entries:
+            if self.id_index is not None:
+                markers[cloud] = row[self.id_index]
+                if self.unique:
+                    if row[self.id_index] in seen:
+                        continue
+                    seen.add(row[self.id_index])
+
+            count += 1
+            yield row
+            if self.limit is not None and count >= self.limit:
+                break
+
+        self.next_marker = format_marker(markers) if markers else None
+        if self.limit is not None and count >= self.limit:
+            logger.info(f"Next marker: {self.next_marker}")
+
+
+def lister_args_xfm_func(interpreter: OidInterpreter, endpoint: str,
+                         *arguments, **keywords) -> Tuple[Tuple, Dict]:
+    """Push the per-cloud marker of a Lister down to each cloud.
+
+    The arguments are the ones of `take_action(self, parsed_args)`. If the
+    `--marker` option is a per-cloud marker (see `parse_marker`), each cloud
+    gets its own marker, or none. Other options, such as `--limit`, apply to
+    every cloud as is, so each one returns at most `limit` rows.
+
+    """
+
+    context, parsed_args = arguments[0], arguments[1]
+    markers = parse_marker(getattr(parsed_args, "marker", None))
+    if markers:
+        parsed_args = copy.copy(parsed_args)
+        parsed_args.marker = markers.get(endpoint)
+
+    return (context, parsed_args) + tuple(arguments[2:]), keywords
+
+
+def _completed(dispatcher: OidDispatcher) -> Future:
+    source: Future = Future()
+    try:
+        source.set_result(dispatcher.result)
+    except Exception as e:
+        source.set_exception(e)
+
+    return source
+
+
+def _get_parts(dispatcher: OidDispatcher) -> List[Tuple[str, Future]]:
+    """Get the pending results of each cloud of a dispatcher.
+
+    The `result` of a leaf that is not resolved yet is not waited for: its
+    execution is submitted to the executor of the dispatch (see
+    `OidDispatcher.submit`), unless the merge already runs in this executor.
+    Since merges wait for the first cloud to answer, the clouds of a scope
+    only run concurrently if their leaves are submitted beforehand, i.e.,
+    with `conj_parallel` (see `image.image_list_scope`).
+
+    """
+
+    if not dispatcher.resolved and not in_worker():
+        return [(dispatcher.endpoint, dispatcher.submit(get_executor()))]
+
+    source = _completed(dispatcher)
+    if not source.exception() and source.result() \
+       and isinstance(source.result()[1], MergedRows):
+        return source.result()[1].parts
+
+    return [(dispatcher.endpoint, source)]
+
+
+def _get_columns(parts: List[Tuple[str, Future]]) -> Sequence[str]:
+    """Get the columns of the first cloud to answer (successfully)."""
+
+    pending = [source for _, source in parts]
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for source in done:
+            if not source.exception() and source.result():
+                return source.result()[0]
+        pending = [source for source in pending if source not in done]
+
+    # Every cloud failed: raise the error of the first one
+    if parts:
+        parts[0][1].result()
+
+    return ()
+
+
+def merge_lister_results(this: OidDispatcher,
+                         other: OidDispatcher,
+                         unique: bool = True,
+                         arrival: Optional[bool] = None) -> Tuple[
+                             Sequence[str], MergedRows]:
+    """Merge the Lister results of two dispatchers (see `MergedRows`).
+
+    The results are not waited for, but the columns of the first cloud to
+    answer, so rows are streamed as clouds answer. The sort column, limit and
+    marker of the merge are read from the `parsed_args` of the command (the
+    second argument of `take_action`). Rows are de-duplicated by ID if
+    `unique` is set. Rows are yielded in `arrival` order, or sorted on the
+    sort column; by default, in arrival order unless there is a sort column.
+
+    """
+
+    parts = _get_parts(this) + _get_parts(other)
+    columns = _get_columns(parts)
+    parsed_args = other.arguments[1] if len(other.arguments) > 1 else None
+    sort_indexes, reverse = parse_sort(getattr(parsed_args, "sort", None),
+                                       columns)
+    names = [_normalize(c) for c in columns]
+    id_index = names.index("id") if "id" in names else None
+
+    rows = MergedRows(parts,
+                      sort_indexes=sort_indexes,
+                      reverse=reverse,
+                      id_index=id_index,
+                      limit=getattr(parsed_args, "limit", None),
+                      markers=parse_marker(getattr(parsed_args, "marker",
+                                                   None)),
+                      unique=unique,
+                      arrival=not sort_indexes if arrival is None else arrival)
+    return columns, rows
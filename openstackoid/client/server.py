@@ -7,11 +7,14 @@
 # Make your OpenStacks Collaborative
 
 
-from typing import Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
 import functools
 import logging
+import threading
 
+from ..configuration import (SERVER_CREATE_MAX_CONCURRENCY,
+                             pop_execution_scope, push_execution_scope)
 from ..dispatcher import OidDispatcher, scope
 from ..interpreter import OidInterpreter
 
@@ -39,27 +42,166 @@ def compute_create_extr_scp_func(interpreter: OidInterpreter,
     return SERVICE_TYPE, service_scope
 
 
+class CreateReport:
+    """Outcome of a 'server create' in each cloud of a conjunctive scope.
+
+    `succeeded` maps a cloud to the result of the command (a `ShowOne` tuple of
+    columns and data, as tuples), and `failed` maps a cloud to its exception,
+    both in the order of the scope.
+
+    """
+
+    def __init__(self,
+                 succeeded: Optional[Dict[str, Tuple]] = None,
+                 failed: Optional[Dict[str, Exception]] = None):
+        self.succeeded = dict(succeeded or {})
+        self.failed = dict(failed or {})
+
+    def update(self, other: "CreateReport") -> None:
+        self.succeeded.update(other.succeeded)
+        self.failed.update(other.failed)
+
+    def aggregate(self) -> Tuple:
+        """Append the columns and data of the clouds that succeeded."""
+
+        columns, data = (), ()
+        for cloud_columns, cloud_data in self.succeeded.values():
+            columns += cloud_columns
+            data += cloud_data
+
+        return columns, data
+
+    def __str__(self):
+        failed = ", ".join(f"{c} ({e})" for c, e in self.failed.items())
+        return (f"succeeded in [{', '.join(self.succeeded)}], "
+                f"failed in [{failed}]")
+
+
+class ServerCreateError(RuntimeError):
+    """A 'server create' failed in some clouds of a conjunctive scope."""
+
+    def __init__(self, report: CreateReport, rolled_back: bool = False):
+        self.report = report
+        self.rolled_back = rolled_back
+        super().__init__(f"Server create {report}"
+                         f"{' (rolled back)' if rolled_back else ''}")
+
+
+def _get_report(dispatcher: OidDispatcher) -> CreateReport:
+    try:
+        result = dispatcher.result
+    except Exception as e:
+        return CreateReport(failed={dispatcher.endpoint: e})
+
+    if isinstance(result, CreateReport):
+        return result
+
+    # A `take_action` may return iterators, e.g., `zip(*sorted(...))`
+    columns, data = map(tuple, result)
+    return CreateReport(succeeded={dispatcher.endpoint: (columns, data)})
+
+
 def compute_create_conj_res_func(
         this: OidDispatcher, other: OidDispatcher) -> OidDispatcher:
     """Aggregate results of the 'and' operator for the 'server create' command.
 
     Apply the aggregation after execution of the command with a compound, and
-    conjunctive scope by appending the results of each endpoint.
+    conjunctive scope by reporting the result, or the exception, of each
+    endpoint (see `CreateReport`). An endpoint failing does not interrupt the
+    aggregation, so the report covers every endpoint of the scope.
 
     In terms of the OS client (thought the cliff library) this is a wrapper for
     a `osc_lib.command.ShowOne` instance.
 
     """
 
-    if this.result and other.result:
-        aggregated = (i + o for i, o in zip(this.result, other.result))
-        other.result = aggregated
+    report = _get_report(this)
+    report.update(_get_report(other))
+    other.result = report
 
     return other
 
 
-# Partial function of the scope decorator for the 'server create' operation.
-compute_create_scope = functools.partial(
-    scope,
-    extr_scp_func=compute_create_extr_scp_func,
-    conj_res_func=compute_create_conj_res_func)
+def delete_server(context, parsed_args, result: Tuple) -> None:
+    """Delete the server created by a `CreateServer.take_action`.
+
+    The `result` is the one of the command (columns and data), and the server
+    is deleted with the compute client of the command in the current
+    execution scope.
+
+    """
+
+    columns, data = result
+    server_id = dict(zip(columns, data))["id"]
+    logger.info(f"Delete server '{server_id}'")
+    context.app.client_manager.compute.servers.delete(server_id)
+
+
+def _rollback(rollback_func: Callable, report: CreateReport,
+              *arguments, **keywords) -> None:
+    for cloud, result in report.succeeded.items():
+        push_execution_scope((SERVICE_TYPE, cloud))
+        try:
+            rollback_func(*arguments, result, **keywords)
+        except Exception as e:
+            logger.error(f"Rollback of the server in '{cloud}' failed: {e}")
+        finally:
+            pop_execution_scope()
+
+
+def compute_create_scope(
+        interpreter: OidInterpreter,
+        max_concurrency: int = SERVER_CREATE_MAX_CONCURRENCY,
+        rollback_func: Optional[Callable] = None,
+        **keywords) -> Callable:
+    """Scope decorator for the 'server create' operation.
+
+    The command is executed on the endpoints of a '&' scope concurrently (see
+    the `conj_parallel` keyword of `scope`), in at most `max_concurrency`
+    endpoints at once. The results of the endpoints are appended as long as
+    every endpoint succeeds. Otherwise, a `ServerCreateError` reports the
+    endpoints that succeeded and the ones that failed, after calling the
+    `rollback_func`, if any, on each endpoint that succeeded, e.g.:
+
+    @compute_create_scope(interpreter, rollback_func=delete_server)
+    def take_action(self, parsed_args):
+        ...
+
+    The `rollback_func` receives the arguments of the command followed by the
+    result of the endpoint, in the execution scope of the endpoint.
+
+    """
+
+    keywords.setdefault("conj_parallel", True)
+    keywords.setdefault("conj_res_func", compute_create_conj_res_func)
+    scoped = scope(interpreter,
+                   extr_scp_func=compute_create_extr_scp_func,
+                   **keywords)
+    semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def decorator(func: Callable) -> Callable:
+
+        @functools.wraps(func)
+        def limited(*arguments, **keywords):
+            with semaphore:
+                return func(*arguments, **keywords)
+
+        scoped_func = scoped(limited)
+
+        @functools.wraps(func)
+        def wrapper(*arguments, **keywords):
+            result = scoped_func(*arguments, **keywords)
+            if not isinstance(result, CreateReport):
+                return result
+
+            if not result.failed:
+                return result.aggregate()
+
+            logger.error(f"Server create {result}")
+            if rollback_func:
+                _rollback(rollback_func, result, *arguments, **keywords)
+            raise ServerCreateError(result, rolled_back=bool(rollback_func))
+
+        return wrapper
+
+    return decorator
@@ -7,10 +7,11 @@
 # Make your OpenStacks Collaborative
 
 
-from typing import Any, Optional
+from concurrent.futures import Executor, Future
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Optional
 
 import copy
-import threading
 
 
 # Name of the execution (atomic) scope
@@ -21,16 +22,102 @@ EXECUTION_SCOPE = "atomic_scope"
 SERVICES_CATALOG_PATH = "file:///etc/openstackoid/catalog.json"
 
 
-# Local storage stack
-__local_context = threading.local()
+# Interval (in seconds) between two checks of changes in the services catalog,
+# 0 disables the reload of the catalog.
+SERVICES_CATALOG_RELOAD_INTERVAL = 5.0
+
+
+# Maximum number of URLs known not to target any service of the catalog kept in
+# cache.
+CATALOG_MISS_CACHE_SIZE = 1024
+
+
+# Maximum number of rewrites of a service to a cloud kept in cache by the
+# interpreter.
+REWRITE_CACHE_SIZE = 4096
+
+
+# Maximum number of compiled scope expressions kept in cache.
+SCOPE_CACHE_SIZE = 128
+
+
+# Maximum number of parsed and serialized scopes kept in cache.
+SCOPE_CODEC_CACHE_SIZE = 256
+
+
+# Format of the scopes piggybacked on requests: "json", or "compact" for short
+# identifiers of service types and clouds derived from the services catalog
+# (see `http.codec.CompactScopeCodec`). Scopes in both formats are always
+# understood, but every service must share the same catalog before enabling the
+# compact one.
+SCOPE_WIRE_FORMAT = "json"
+
+
+# Maximum number of threads of the pool used to dispatch executions
+# concurrently.
+DISPATCH_MAX_WORKERS = 32
+
+
+# Circuit breaker of the health registry: number of consecutive failures of a
+# cloud before it is skipped, delay (in seconds) before a skipped cloud is
+# probed again, and weight of the last latency in the average latency of a
+# cloud.
+HEALTH_FAILURE_THRESHOLD = 3
+HEALTH_RESET_TIMEOUT = 30.0
+HEALTH_LATENCY_WEIGHT = 0.2
+
+
+# Maximum number of clouds in which a server is created concurrently by a
+# 'server create' with a conjunctive scope.
+SERVER_CREATE_MAX_CONCURRENCY = 8
+
+
+# Maximum number of idle keep-alive connections kept per backend by the proxy,
+# and size (in bytes) of the chunks of bodies streamed by the proxy.
+PROXY_POOL_SIZE = 16
+PROXY_BUFFER_SIZE = 64 * 1024
+
+
+# Maximum number and lifetime (in seconds) of the admin Keystone clients kept
+# by the keystonemiddleware decorator.
+KEYSTONE_CLIENTS_SIZE = 64
+KEYSTONE_CLIENTS_TTL = 3600.0
+
+
+# Maximum number of validated tokens kept in the in-process token cache of the
+# keystonemiddleware decorator, and maximum lifetime (in seconds) of a cached
+# validation, which bounds the delay before a revoked token is rejected.
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 300.0
+
+
+# Context storage. Context variables are local to a thread or an asyncio task
+# and are only propagated to other threads through `submit_in_context`.
+__local_context = {
+    "shell_scope": ContextVar("shell_scope", default=None),
+    EXECUTION_SCOPE: ContextVar(EXECUTION_SCOPE, default=None)
+}
 
 
 def _get_from_context(name: str) -> Optional[Any]:
-    return getattr(__local_context, name, None)
+    variable = __local_context.get(name)
+    return variable.get() if variable else None
 
 
 def _push_to_context(name: str, value: Any) -> None:
-    setattr(__local_context, name, value)
+    __local_context[name].set(value)
+
+
+def submit_in_context(executor: Executor, func: Callable,
+                      *arguments, **keywords) -> Future:
+    """Submit `func` to the `executor` within a copy of the current context.
+
+    The shell scope and the execution scope stack are thus propagated to the
+    thread running `func`, while the scopes it pushes remain local to it.
+
+    """
+
+    return executor.submit(copy_context().run, func, *arguments, **keywords)
 
 
 def get_shell_scope() -> dict:
@@ -73,14 +160,10 @@ def push_execution_scope(value: tuple) -> None:
     if any(operator in value[1] for operator in "|&^"):
         raise ValueError("Atomic scope must not include operators.")
 
-    # `execution_scope` is an stack data type
-    stack = _get_from_context(EXECUTION_SCOPE)
-    if stack:
-        stack.append(value)
-    else:
-        stack = [value]
-
-    _push_to_context(EXECUTION_SCOPE, stack)
+    # `execution_scope` is an stack data type. The stack is an immutable tuple,
+    # so a copy of the context never modifies the stack of its origin
+    stack = _get_from_context(EXECUTION_SCOPE) or ()
+    _push_to_context(EXECUTION_SCOPE, stack + (value,))
 
 
 def pop_execution_scope() -> Optional[tuple]:
@@ -89,4 +172,8 @@ def pop_execution_scope() -> Optional[tuple]:
     """
 
     stack = _get_from_context(EXECUTION_SCOPE)
-    return stack.pop() if stack else None
+    if not stack:
+        return None
+
+    _push_to_context(EXECUTION_SCOPE, stack[:-1])
+    return stack[-1]
@@ -7,13 +7,21 @@
 # Make your OpenStacks Collaborative
 
 
-from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+from concurrent.futures import (FIRST_COMPLETED, Executor, Future,
+                                ThreadPoolExecutor, TimeoutError, wait)
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
 
 import ast
+import asyncio
 import functools
 import logging
+import threading
+import time
 
-from .configuration import pop_execution_scope, push_execution_scope
+from .configuration import (DISPATCH_MAX_WORKERS, SCOPE_CACHE_SIZE,
+                            pop_execution_scope, push_execution_scope,
+                            submit_in_context)
+from .health import HealthRegistry
 from .interpreter import OidInterpreter
 from .utils import print_func_signature
 
@@ -28,6 +36,44 @@ FILTERED_KEYS = (ast.Load, ast.And, ast.Or, ast.BitOr, ast.BitAnd, ast.BitXor)
 T = TypeVar("T")
 
 
+# Pool of threads shared by all concurrent evaluations, created on demand
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+# Thread local flag set in the threads of the pool
+_worker_context = threading.local()
+
+
+def _init_worker() -> None:
+    _worker_context.active = True
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the pool of threads used to dispatch executions concurrently.
+
+    """
+
+    global _executor
+    with _executor_lock:
+        if not _executor:
+            _executor = ThreadPoolExecutor(max_workers=DISPATCH_MAX_WORKERS,
+                                           thread_name_prefix="oid-dispatch",
+                                           initializer=_init_worker)
+    return _executor
+
+
+def in_worker() -> bool:
+    """Test if the current thread belongs to the pool of `get_executor`.
+
+    Nested scopes evaluated from a thread of the pool run sequentially, since
+    waiting on the same (bounded) pool may deadlock.
+
+    """
+
+    return getattr(_worker_context, "active", False)
+
+
 class OidDispatcher(Generic[T]):
     """Dispatch a function execution to the appropriate endpoint.
 
@@ -52,7 +98,10 @@ class OidDispatcher(Generic[T]):
             args_xfm_func: Callable[..., Tuple[Tuple, Dict]],
             disj_res_func: Callable[..., T],
             conj_res_func: Callable[..., T],
-            *arguments, **keywords):
+            *arguments,
+            health: Optional[HealthRegistry] = None,
+            health_evl_func: Optional[Callable[..., bool]] = None,
+            **keywords):
         """Initialize the attributes to execute a function in a target endpoint.
 
         :param interpreter: Instance of the scope interpreter
@@ -67,6 +116,12 @@ class OidDispatcher(Generic[T]):
            `__or__` operation of the `result` property
         :param conj_res_fun: Method to evaluate the binary arithmetic
            `__and__` operation of the `result` property
+        :param health: Registry recording the outcome of each execution of the
+           `func`, and refusing executions on an endpoint whose circuit
+           breaker is open, if any
+        :param health_evl_func: Method to evaluate whether a result of the
+           `func` is a success of the endpoint (`default_health_evl_func` by
+           default). Any exception of the `func` is a failure
 
         """
 
@@ -78,22 +133,51 @@ class OidDispatcher(Generic[T]):
         self.args_xfm_func = args_xfm_func
         self.disj_res_func = disj_res_func
         self.conj_res_func = conj_res_func
+        self.health = health
+        self.health_evl_func = health_evl_func or default_health_evl_func
         self.arguments = arguments
         self.keywords = keywords
 
-        # Result property. It is initialized on demand only
+        # Result property. It is initialized on demand only, and then kept
+        # (even if falsy or an exception), so the `func` runs at most once
         self._result: Optional[T] = None
+        self._error: Optional[Exception] = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+        # Pending execution of `run_func` when submitted to an executor
+        self._future: Optional[Future] = None
+        self._timeout: Optional[float] = None
 
     @property
     def result(self) -> Optional[T]:
-        if not self._result:
-            self._result = self.run_func()
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    try:
+                        self._result = (
+                            self._future.result(timeout=self._timeout)
+                            if self._future else self.run_func())
+                    except Exception as e:
+                        self._error = e
+                    self._resolved = True
+
+        if self._error is not None:
+            raise self._error
 
         return self._result
 
     @result.setter
     def result(self, value) -> None:
         self._result = value
+        self._error = None
+        self._resolved = True
+
+    @property
+    def resolved(self) -> bool:
+        """Test if the `result` is available without waiting for it."""
+
+        return self._resolved
 
     def __bool__(self):
         return self.bool_evl_func(self)
@@ -107,6 +191,24 @@ class OidDispatcher(Generic[T]):
     def __str__(self):
         return f"{self.endpoint}" if self.endpoint else "None"
 
+    def submit(self, executor: Executor,
+               timeout: Optional[float] = None) -> Future:
+        """Execute the `func` in background through the `executor`.
+
+        The `result` property waits for the completion of the submitted
+        execution instead of running the `func` again, at most `timeout`
+        seconds (forever if `None`) before raising a `TimeoutError`. The
+        execution is not interrupted by the timeout, it keeps running on the
+        `executor` until it completes.
+
+        """
+
+        if not self._future:
+            self._timeout = timeout
+            self._future = submit_in_context(executor, self.run_func)
+
+        return self._future
+
     def run_func(self) -> Optional[T]:
         """Execute the `func` according to the target scope.
 
@@ -126,100 +228,477 @@ class OidDispatcher(Generic[T]):
         # helper print (read-only) decorator for logging
         func = print_func_signature(self.func)
 
-        # 3. Execute the function with the proper attributes
-        result: T = func(*args, **kwargs)
+        # 3. Execute the function with the proper attributes, and record its
+        # outcome in the health registry, if any
+        # 4. Release (free) the scope from local context, even on error
+        try:
+            if self.health is None:
+                return func(*args, **kwargs)
 
-        # 4. Release (free) the scope from local context
-        pop_execution_scope()
-        return result
+            return self.health.track(self.endpoint, func, *args,
+                                     healthy=self.health_evl_func, **kwargs)
+        finally:
+            pop_execution_scope()
 
 
-class ScopeTransformer(ast.NodeTransformer, Generic[T]):
-    """AST transformer class to evaluate a simple/compound OID scope.
+class AsyncOidDispatcher(OidDispatcher[T]):
+    """Dispatch a coroutine function execution to the appropriate endpoint.
 
-    An Openstackoïd scope is a valid Python expression of a given supported
-    type. This expression is parsed (visited) and transformed in a
-    `OidDispatcher`. Two types of expression are supported during evaluation of
-    the scope, 'Name' identifiers and 'Binary Operators'. During the scope
-    evaluation, execution of the method associated to the `OidDispatcher` is
-    executed in order to evaluate the truth value.
+    Asynchronous twin of `OidDispatcher`. The `func` is awaited by `resolve`,
+    and the `result` property is only available once the dispatcher has been
+    resolved, so the (synchronous) `bool_evl_func`, `disj_res_func` and
+    `conj_res_func` hooks are reused as is.
+
+    """
+
+    def __init__(self, *arguments, **keywords):
+        super().__init__(*arguments, **keywords)
+
+        # Pending execution of `arun_func`, awaited by every `resolve`
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def result(self) -> Optional[T]:
+        if not self._resolved:
+            raise RuntimeError(f"Dispatcher '{self}' is not resolved yet.")
+
+        return self._result
+
+    @result.setter
+    def result(self, value) -> None:
+        self._result = value
+        self._resolved = True
+
+    async def resolve(self) -> "AsyncOidDispatcher[T]":
+        """Await the execution of the `func`, only once.
+
+        Concurrent resolutions (e.g., of a leaf shared by the two sides of a
+        conjunction) await the same execution.
+
+        """
+
+        if not self._resolved:
+            if self._task is None:
+                self._task = asyncio.ensure_future(self.arun_func())
+            self.result = await self._task
+
+        return self
+
+    async def arun_func(self) -> Optional[T]:
+        """Execute the coroutine `func` according to the target scope.
+
+        See `OidDispatcher.run_func`.
+
+        """
+
+        args, kwargs = self.args_xfm_func(self.interpreter, self.endpoint,
+                                          *self.arguments, **self.keywords)
+        execution_scope = (self.service_type, self.endpoint)
+        push_execution_scope(execution_scope)
+
+        # The scope is released even if the execution is cancelled (e.g., the
+        # loser of a hedged disjunction)
+        try:
+            func = print_func_signature(self.func)
+            return await func(*args, **kwargs)
+        finally:
+            pop_execution_scope()
+
+
+class ScopePlan:
+    """Compiled evaluation plan of a simple/compound OID scope.
+
+    A plan is the result of the parsing of a scope expression, independent of
+    the function to execute. It is either a leaf (`endpoint` is set) or a binary
+    operation (`operator`, `left` and `right` are set). A plan is evaluated by a
+    `ScopeEvaluator` and can be reused across calls of a scoped function.
 
     """
 
     def __init__(self,
-                 interpreter: OidInterpreter,
-                 service_type: str,
-                 func: Callable[..., T],
-                 bool_evl_func: Callable[..., bool],
-                 args_xfm_func: Callable[..., Tuple[Tuple, Dict]],
-                 disj_res_func: Callable[..., OidDispatcher],
-                 conj_res_func: Callable[..., OidDispatcher],
-                 *arguments, **keywords):
-        """Constructor required to initalize OidDispatcher instance[s].
-
-        It requires an interpreter object to dispatch the execution to the
-        proper endpoint. It also requires the service type of the (execution)
-        scope that is processed. Additionally it is required all the parameters
-        to initialize an `OidDispatcher` (see documentation of the `scope`
-        decorator for details).
+                 endpoint: Optional[str] = None,
+                 operator: Optional[str] = None,
+                 left: Optional["ScopePlan"] = None,
+                 right: Optional["ScopePlan"] = None):
+        self.endpoint = endpoint
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+    def __str__(self):
+        if self.endpoint is not None:
+            return self.endpoint
+
+        return f"({self.left} {self.operator[2:-2]} {self.right})"
+
+    def conjunctive_leaves(self) -> List["ScopePlan"]:
+        """Leaves of the plan only reachable through '&' operators.
+
+        These leaves are all executed during the evaluation of the conjunction,
+        and independently from each other.
 
         """
 
-        self.interpreter = interpreter
-        self.service_type = service_type
-        self.func: Callable[..., T] = func
-        self.bool_evl_func: Callable[..., bool] = bool_evl_func
-        self.args_xfm_func: Callable[..., Tuple[Tuple, Dict]] = args_xfm_func
-        self.disj_res_func: Callable[..., OidDispatcher] = disj_res_func
-        self.conj_res_func: Callable[..., OidDispatcher] = conj_res_func
-        self.arguments = arguments
-        self.keywords = keywords
+        if self.endpoint is not None:
+            return [self]
 
-    def visit_Name(self, node):
-        """Process a simple scope (tree's leaf) as a Python AST.
+        if self.operator != "__and__":
+            return []
+
+        return self.left.conjunctive_leaves() + self.right.conjunctive_leaves()
+
+    def endpoints(self) -> List[str]:
+        """Endpoints of every leaf of the plan."""
+
+        if self.endpoint is not None:
+            return [self.endpoint]
+
+        return self.left.endpoints() + self.right.endpoints()
+
+
+class ScopeEvaluator:
+    """Evaluate a `ScopePlan` with the dispatchers of a scoped call.
+
+    Evaluating a plan creates the `OidDispatcher` instances of its leaves and
+    combines them with their operators, the left side before the right one, as
+    the Python operators do. Optionally, the evaluator relies on an executor to:
+
+    - run the leaves of a conjunction concurrently (`conj_parallel`), the
+      results being still combined in order by the `conj_res_func`;
+    - hedge a disjunction (`disj_hedge`), i.e., launch its right side after a
+      delay when the left side is still running, and keep the first truthy
+      side. The loser is cancelled when it has not started yet. Otherwise it
+      keeps running on the executor until it completes, side effects included
+      (e.g., a request sent to its endpoints), and its result is discarded.
+
+    With a `health` registry, a side of a disjunction whose endpoints all have
+    an open circuit breaker is skipped, unless both sides are.
+
+    """
+
+    def __init__(self,
+                 make_dispatcher: Callable[[str], OidDispatcher],
+                 executor: Optional[Executor] = None,
+                 conj_parallel: bool = False,
+                 conj_timeout: Optional[float] = None,
+                 disj_hedge: Optional[float] = None,
+                 disj_timeout: Optional[float] = None,
+                 health: Optional[HealthRegistry] = None):
+        """Initialize the evaluator of a scoped call.
+
+        :param make_dispatcher: Method returning the `OidDispatcher` of a leaf
+           from the name of its endpoint
+        :param executor: Executor for concurrent evaluations, if any
+        :param conj_parallel: Execute the leaves of a conjunction concurrently
+        :param conj_timeout: Maximum time (in seconds) to wait for the result of
+           a leaf executed concurrently
+        :param disj_hedge: Delay (in seconds) before launching the right side of
+           a disjunction, `None` disables hedging
+        :param disj_timeout: Maximum time (in seconds) to wait for a truthy side
+           of a hedged disjunction
+        :param health: Health registry of the endpoints, if any
 
-        :returns: A `OidDispatcher` instance representing the leaf.
         """
 
-        logger.debug(f"Processing '{node.id}'")
-        return OidDispatcher(self.interpreter,
-                             self.service_type,
-                             node.id,
-                             self.func,
-                             self.bool_evl_func,
-                             self.args_xfm_func,
-                             self.disj_res_func,
-                             self.conj_res_func,
-                             *self.arguments, **self.keywords)
+        self.make_dispatcher = make_dispatcher
+        self.executor = executor
+        self.conj_parallel = conj_parallel
+        self.conj_timeout = conj_timeout
+        self.disj_hedge = disj_hedge
+        self.disj_timeout = disj_timeout
+        self.health = health
 
-    def visit_BinOp(self, node):
-        """Process a compound scope (with operator[s]) as a Python AST.
+        # Dispatchers of leaves submitted ahead of their evaluation
+        self._prefetched: Dict[int, OidDispatcher] = {}
 
-        This method is recursively executed by visiting all nodes until reaches
-        the leaves of the three.
+    def evaluate(self, plan: ScopePlan) -> OidDispatcher:
+        """Evaluate the `plan`.
 
         :returns: A `OidDispatcher` instance representing the result of the
-            branch evaluation.
+            evaluation.
 
         """
 
-        # call to the 'super' method is required for implicit recursivity
-        super(ScopeTransformer, self).generic_visit(node)
-        operator = "__{}__".format(node.op.__class__.__name__[3:].lower())
+        if plan.endpoint is not None:
+            logger.debug(f"Processing '{plan.endpoint}'")
+            dispatcher = self._prefetched.pop(id(plan), None)
+            if dispatcher is None:
+                dispatcher = self.make_dispatcher(plan.endpoint)
+
+            return dispatcher
+
+        if self.health is not None and plan.operator == "__or__":
+            side = self._skip_open(plan)
+            if side is not None:
+                return self.evaluate(side)
+
+        if self.executor:
+            if self.conj_parallel and plan.operator == "__and__":
+                self._prefetch(plan)
+            elif self.disj_hedge is not None and plan.operator == "__or__":
+                return self._hedge(plan)
+
+        left = self.evaluate(plan.left)
+        right = self.evaluate(plan.right)
+        result = getattr(left, plan.operator)(right)
+        logger.debug(f"Evaluation: [{result}] "
+                     f"({left} {plan.operator[2:-2]} {right})")
+        return result
+
+    def _skip_open(self, plan: ScopePlan) -> Optional[ScopePlan]:
+        """Get the side of the disjunction `plan` to evaluate alone, if any.
+
+        """
 
-        # check that there is left and right side before evaluating the nodes
-        if hasattr(node, "left") and hasattr(node, "right"):
-            left = node.left
-            right = node.right
+        def is_open(side: ScopePlan) -> bool:
+            return all(self.health.is_open(e) for e in side.endpoints())
+
+        left_open, right_open = is_open(plan.left), is_open(plan.right)
+        if left_open == right_open:
+            return None
+
+        logger.info(f"Skipping '{plan.left if left_open else plan.right}' "
+                    f"(circuit breaker open) in {plan}")
+        return plan.right if left_open else plan.left
+
+    def _prefetch(self, plan: ScopePlan) -> None:
+        """Submit the leaves of the conjunction `plan` to the executor."""
+
+        for leaf in plan.conjunctive_leaves():
+            if id(leaf) not in self._prefetched:
+                dispatcher = self.make_dispatcher(leaf.endpoint)
+                dispatcher.submit(self.executor, timeout=self.conj_timeout)
+                self._prefetched[id(leaf)] = dispatcher
+
+    def _settle(self, plan: ScopePlan) -> Tuple[OidDispatcher, bool]:
+        """Evaluate (sequentially) a side of a hedged disjunction."""
+
+        dispatcher = ScopeEvaluator(self.make_dispatcher,
+                                    health=self.health).evaluate(plan)
+        return dispatcher, bool(dispatcher)
+
+    def _hedge(self, plan: ScopePlan) -> OidDispatcher:
+        """Evaluate the disjunction `plan` by racing its two sides.
+
+        Returns the first truthy side, the left one being preferred when both
+        are. Otherwise, returns the right side (as the Python 'or' does). Raise
+        a `TimeoutError` if no side is truthy before `disj_timeout`.
+
+        """
+
+        deadline = (time.monotonic() + self.disj_timeout
+                    if self.disj_timeout is not None else None)
+
+        def remaining(delay: Optional[float] = None) -> Optional[float]:
+            if deadline is None:
+                return delay
+
+            left_time = max(0.0, deadline - time.monotonic())
+            return left_time if delay is None else min(delay, left_time)
+
+        sides = [plan.left, plan.right]
+        futures: List[Future] = [
+            submit_in_context(self.executor, self._settle, sides[0])]
+        wait(futures, timeout=remaining(self.disj_hedge))
+
+        while True:
+            # Look for a truthy side, preferring the left one. A side raising
+            # an exception is considered as falsy
+            for future in futures:
+                if future.done() and not future.exception() \
+                   and future.result()[1]:
+                    for loser in futures:
+                        loser.cancel()
+                    dispatcher = future.result()[0]
+                    logger.debug(f"Hedged evaluation: [{dispatcher}] {plan}")
+                    return dispatcher
+
+            if len(futures) == len(sides) and \
+               all(future.done() for future in futures):
+                # Re-raise the exception of the right side, if any
+                return futures[-1].result()[0]
+
+            # Launch the right side once the delay expired or the left one
+            # failed
+            if len(futures) < len(sides):
+                logger.debug(f"Hedging with '{sides[1]}'")
+                futures.append(
+                    submit_in_context(self.executor, self._settle, sides[1]))
+
+            # Both sides may complete in the meantime, check them again
+            pending = [future for future in futures if not future.done()]
+            if not pending:
+                continue
+
+            done, _ = wait(pending, timeout=remaining(),
+                           return_when=FIRST_COMPLETED)
+            if not done and remaining() == 0:
+                for loser in futures:
+                    loser.cancel()
+                raise TimeoutError(f"No result of {plan} after "
+                                   f"{self.disj_timeout}s")
+
+
+class AsyncScopeEvaluator:
+    """Evaluate a `ScopePlan` with the dispatchers of an asynchronous call.
+
+    Asynchronous twin of `ScopeEvaluator`. The two sides of a conjunction are
+    evaluated concurrently with `asyncio.gather`. A disjunction is
+    short-circuited: its right side is only evaluated if the left one is falsy,
+    or, when hedged (`disj_hedge`), launched after a delay and the loser
+    cancelled.
+
+    """
+
+    def __init__(self,
+                 make_dispatcher: Callable[[str], AsyncOidDispatcher],
+                 conj_timeout: Optional[float] = None,
+                 disj_hedge: Optional[float] = None,
+                 disj_timeout: Optional[float] = None):
+        """Initialize the evaluator of an asynchronous scoped call.
+
+        See `ScopeEvaluator` for the parameters.
+
+        """
+
+        self.make_dispatcher = make_dispatcher
+        self.conj_timeout = conj_timeout
+        self.disj_hedge = disj_hedge
+        self.disj_timeout = disj_timeout
+
+    async def evaluate(self, plan: ScopePlan,
+                       timeout: Optional[float] = None) -> AsyncOidDispatcher:
+        """Evaluate the `plan`, resolving all the dispatchers it requires.
+
+        :param timeout: Maximum time (in seconds) to wait for the resolution of
+           a leaf
+        :returns: A `AsyncOidDispatcher` instance representing the result of
+            the evaluation.
+
+        """
+
+        if plan.endpoint is not None:
+            logger.debug(f"Processing '{plan.endpoint}'")
+            dispatcher = self.make_dispatcher(plan.endpoint)
+            return await asyncio.wait_for(dispatcher.resolve(), timeout)
+
+        if plan.operator == "__and__":
+            left, right = await asyncio.gather(
+                self.evaluate(plan.left, self.conj_timeout),
+                self.evaluate(plan.right, self.conj_timeout))
+        elif plan.operator == "__or__":
+            if self.disj_hedge is not None:
+                return await self._hedge(plan)
+
+            left = await self.evaluate(plan.left)
+            if left:
+                return left
+
+            right = await self.evaluate(plan.right)
         else:
-            left = node.left if hasattr(node, 'left') else node.right
-            right = OidDispatcher(None, None, lambda x: x, lambda x: False)
+            left = await self.evaluate(plan.left)
+            right = await self.evaluate(plan.right)
 
-        result = getattr(left, operator)(right)
+        result = getattr(left, plan.operator)(right)
         logger.debug(f"Evaluation: [{result}] "
-                     f"({left} {operator[2:-2]} {right})")
+                     f"({left} {plan.operator[2:-2]} {right})")
         return result
 
+    async def _hedge(self, plan: ScopePlan) -> AsyncOidDispatcher:
+        """Evaluate the disjunction `plan` by racing its two sides.
+
+        See `ScopeEvaluator._hedge`. Raise an `asyncio.TimeoutError` if no side
+        is truthy before `disj_timeout`.
+
+        """
+
+        loop = asyncio.get_running_loop()
+        deadline = (loop.time() + self.disj_timeout
+                    if self.disj_timeout is not None else None)
+
+        def remaining(delay: Optional[float] = None) -> Optional[float]:
+            if deadline is None:
+                return delay
+
+            left_time = max(0.0, deadline - loop.time())
+            return left_time if delay is None else min(delay, left_time)
+
+        sides = [plan.left, plan.right]
+        tasks = [asyncio.ensure_future(self.evaluate(sides[0]))]
+        await asyncio.wait(tasks, timeout=remaining(self.disj_hedge))
+
+        try:
+            while True:
+                # Look for a truthy side, preferring the left one. A side
+                # raising an exception is considered as falsy
+                for task in tasks:
+                    if task.done() and not task.exception() \
+                       and task.result():
+                        logger.debug(f"Hedged evaluation: [{task.result()}] "
+                                     f"{plan}")
+                        return task.result()
+
+                if len(tasks) == len(sides) and \
+                   all(task.done() for task in tasks):
+                    # Re-raise the exception of the right side, if any
+                    return tasks[-1].result()
+
+                if len(tasks) < len(sides):
+                    logger.debug(f"Hedging with '{sides[1]}'")
+                    tasks.append(asyncio.ensure_future(
+                        self.evaluate(sides[1])))
+
+                pending = [task for task in tasks if not task.done()]
+                if not pending:
+                    continue
+
+                done, _ = await asyncio.wait(pending, timeout=remaining(),
+                                             return_when=FIRST_COMPLETED)
+                if not done and remaining() == 0:
+                    raise asyncio.TimeoutError(f"No result of {plan} after "
+                                               f"{self.disj_timeout}s")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class ScopeCompiler(ast.NodeVisitor):
+    """AST visitor class to compile a simple/compound OID scope.
+
+    Transform the Python AST of a scope into a `ScopePlan`. Only 'Name'
+    identifiers and 'Binary Operators' are supported, any other expression
+    raises a `ValueError`.
+
+    """
+
+    def visit_Expression(self, node):
+        return self.visit(node.body)
+
+    def visit_Name(self, node):
+        return ScopePlan(endpoint=node.id)
+
+    def visit_BinOp(self, node):
+        operator = "__{}__".format(node.op.__class__.__name__[3:].lower())
+        return ScopePlan(operator=operator,
+                         left=self.visit(node.left),
+                         right=self.visit(node.right))
+
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported scope expression: {ast.dump(node)}")
+
+
+@functools.lru_cache(maxsize=SCOPE_CACHE_SIZE)
+def compile_scope(scope: str) -> ScopePlan:
+    """Parse and compile a scope expression into a `ScopePlan`.
+
+    Compiled plans are kept in a bounded LRU cache keyed by the scope
+    expression. Use `compile_scope.cache_info()` to get the hit/miss counters
+    of the cache and `compile_scope.cache_clear()` to empty it.
+
+    """
+
+    return ScopeCompiler().visit(ast.parse(scope, mode='eval'))
+
 
 # Default (lambda) method for the truth evaluation of an OidDispatcher result.
 default_bool_evl_func = lambda dispatcher: True if dispatcher.result else False  # noqa
@@ -240,13 +719,95 @@ default_disj_res_func = lambda this, other: this if this else other if other els
 default_conj_res_func = lambda this, other: other if this and other else None  # noqa
 
 
+# Default (lambda) method to evaluate the health of an endpoint from a result,
+# by default any result (i.e., no exception) is a success.
+default_health_evl_func = lambda result: True  # noqa
+
+
+class SharedExecution:
+    """Execution of a function shared by the dispatchers of an endpoint.
+
+    The first dispatcher of the endpoint executes its `run_func` (or awaits
+    its `arun_func`), and the others wait for the same result or exception.
+
+    """
+
+    def __init__(self, dispatcher: OidDispatcher):
+        self._run_func = dispatcher.run_func
+        self._arun_func = getattr(dispatcher, "arun_func", None)
+        self._result: Optional[T] = None
+        self._error: Optional[Exception] = None
+        self._done = False
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Future] = None
+
+    def run_func(self) -> Optional[T]:
+        with self._lock:
+            if not self._done:
+                try:
+                    self._result = self._run_func()
+                except Exception as e:
+                    self._error = e
+                self._done = True
+
+        if self._error is not None:
+            raise self._error
+
+        return self._result
+
+    async def arun_func(self) -> Optional[T]:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._arun_func())
+
+        # A dispatcher that is cancelled does not cancel the others
+        return await asyncio.shield(self._task)
+
+
+def share_leaves(make_dispatcher: Callable[[str], OidDispatcher]
+                 ) -> Callable[[str], OidDispatcher]:
+    """Share one execution among identical leaves.
+
+    Wrap the `make_dispatcher` of a scoped call so that the dispatchers of
+    every leaf of the same endpoint share a `SharedExecution`, e.g.,
+    `Instance2` in `Instance2 & Instance1 & Instance2` is executed once. Each
+    leaf still has its own dispatcher, so its result is combined once per
+    leaf by the `conj_res_func` and `disj_res_func`, even when they replace
+    the `result` of a dispatcher.
+
+    """
+
+    executions: Dict[str, SharedExecution] = {}
+    lock = threading.Lock()
+
+    def make_shared_dispatcher(endpoint: str) -> OidDispatcher:
+        dispatcher = make_dispatcher(endpoint)
+        with lock:
+            execution = executions.get(endpoint)
+            if execution is None:
+                execution = executions[endpoint] = SharedExecution(dispatcher)
+
+        dispatcher.run_func = execution.run_func
+        if isinstance(dispatcher, AsyncOidDispatcher):
+            dispatcher.arun_func = execution.arun_func
+        return dispatcher
+
+    return make_shared_dispatcher
+
+
 def scope(interpreter: OidInterpreter,
           extr_scp_func: Callable[..., str],
           bool_evl_func: Callable[..., bool] = default_bool_evl_func,
           args_xfm_func: Callable[...,
                                   Tuple[Tuple, Dict]] = default_args_xfm_func,
           disj_res_func: Callable[..., OidDispatcher] = default_disj_res_func,
-          conj_res_func: Callable[..., OidDispatcher] = default_conj_res_func):
+          conj_res_func: Callable[..., OidDispatcher] = default_conj_res_func,
+          conj_parallel: bool = False,
+          conj_timeout: Optional[float] = None,
+          disj_hedge: Optional[float] = None,
+          disj_timeout: Optional[float] = None,
+          shared_leaves: bool = False,
+          health: Optional[HealthRegistry] = None,
+          health_evl_func: Callable[..., bool] = default_health_evl_func):
     """Wrapper method to pass attributes to the `scope` decorator.
 
     Most of parameters include defaults and are required in order to create an
@@ -254,6 +815,31 @@ def scope(interpreter: OidInterpreter,
     more details.
 
     :param extr_scp_func: Method to extract the scope from
+    :param conj_parallel: Execute the leaves of a conjunction concurrently on
+       the pool of `get_executor` (results are aggregated as usual with the
+       `conj_res_func`)
+    :param conj_timeout: Maximum time (in seconds) to wait for a leaf of a
+       conjunction executed concurrently. A leaf that times out is not
+       interrupted and keeps running on the pool until it completes
+    :param disj_hedge: Hedge disjunctions on the pool of `get_executor`: the
+       right side is launched after `disj_hedge` seconds (0 for immediately) if
+       the left side is not yet truthy, and the first truthy side wins. This
+       bypasses the `disj_res_func`. A losing side that already started is
+       not interrupted: it runs to completion on the pool, with its side
+       effects, so only hedge idempotent functions
+    :param disj_timeout: Maximum time (in seconds) to wait for a truthy side of
+       a hedged disjunction
+    :param shared_leaves: Execute the function once per endpoint, even if the
+       endpoint appears several times in the scope (see `share_leaves`)
+    :param health: Registry recording the failures and latency of each
+       endpoint (e.g., `get_health_registry`). An endpoint whose circuit
+       breaker is open raises a `CircuitOpenError` without executing the
+       function, and is skipped in disjunctions
+    :param health_evl_func: Method to evaluate whether a result is a success
+       of the endpoint. Any exception raised by the function is a failure of
+       the endpoint, including client errors (e.g., a `NotFound` raised by the
+       OS client), so `health` suits functions whose exceptions denote an
+       unavailable endpoint, such as `Session.send`
 
     """
 
@@ -277,23 +863,112 @@ def scope(interpreter: OidInterpreter,
             service_type, scope = extr_scp_func(
                 interpreter, *arguments, **keywords)
 
-            # 2. Parse the scope as an AST and evaluate the tree
-            tree = ast.parse(scope, mode='eval')
+            # 2. Get the compiled plan of the scope (parsed once per scope)
+            plan = compile_scope(scope)
 
             # 3. Execute the provided function to the appropriate endpoint. The
             # execution is implicit because is performed during the evaluation
             # of the scope expression
-            dispatcher: OidDispatcher[T] = ScopeTransformer[T](
-                interpreter,
-                service_type,
-                func,
-                bool_evl_func,
-                args_xfm_func,
-                disj_res_func,
-                conj_res_func,
-                *arguments, **keywords).visit(tree.body)
+            def make_dispatcher(endpoint: str) -> OidDispatcher[T]:
+                return OidDispatcher[T](interpreter,
+                                        service_type,
+                                        endpoint,
+                                        func,
+                                        bool_evl_func,
+                                        args_xfm_func,
+                                        disj_res_func,
+                                        conj_res_func,
+                                        *arguments,
+                                        health=health,
+                                        health_evl_func=health_evl_func,
+                                        **keywords)
+
+            if shared_leaves:
+                make_dispatcher = share_leaves(make_dispatcher)
+
+            concurrent = conj_parallel or disj_hedge is not None
+            executor = get_executor() \
+                if concurrent and not in_worker() else None
+            evaluator = ScopeEvaluator(make_dispatcher,
+                                       executor,
+                                       conj_parallel=conj_parallel,
+                                       conj_timeout=conj_timeout,
+                                       disj_hedge=disj_hedge,
+                                       disj_timeout=disj_timeout,
+                                       health=health)
+            dispatcher: OidDispatcher[T] = evaluator.evaluate(plan)
 
             # 4. return the result of the execution after the truth evaluation
             return dispatcher.result if dispatcher else None
         return wrapper
     return decorator
+
+
+def async_scope(interpreter: OidInterpreter,
+                extr_scp_func: Callable[..., str],
+                bool_evl_func: Callable[..., bool] = default_bool_evl_func,
+                args_xfm_func: Callable[...,
+                                        Tuple[Tuple,
+                                              Dict]] = default_args_xfm_func,
+                disj_res_func: Callable[...,
+                                        OidDispatcher] = default_disj_res_func,
+                conj_res_func: Callable[...,
+                                        OidDispatcher] = default_conj_res_func,
+                conj_timeout: Optional[float] = None,
+                disj_hedge: Optional[float] = None,
+                disj_timeout: Optional[float] = None,
+                shared_leaves: bool = False):
+    """Wrapper method to pass attributes to the `async_scope` decorator.
+
+    Asynchronous twin of `scope` for coroutine functions. Parameters are the
+    same, except that conjunctions are always evaluated concurrently (on the
+    running event loop) and `conj_timeout` applies to every leaf of a
+    conjunction.
+
+    """
+
+    def decorator(func: Callable):
+        """The `async_scope` decorator to dispatch a coroutine function.
+
+        :param func: The scoped coroutine function
+
+        """
+
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError("Scoped function must be a coroutine function.")
+
+        @functools.wraps(func)
+        async def wrapper(*arguments, **keywords):
+            """Wrapper implementing the `async_scope` decorator business logic.
+
+            :param arguments: varargs of the scoped method
+            :param keywords: kwargs of the scoped method
+
+            """
+
+            service_type, scope = extr_scp_func(
+                interpreter, *arguments, **keywords)
+            plan = compile_scope(scope)
+
+            def make_dispatcher(endpoint: str) -> AsyncOidDispatcher[T]:
+                return AsyncOidDispatcher[T](interpreter,
+                                             service_type,
+                                             endpoint,
+                                             func,
+                                             bool_evl_func,
+                                             args_xfm_func,
+                                             disj_res_func,
+                                             conj_res_func,
+                                             *arguments, **keywords)
+
+            if shared_leaves:
+                make_dispatcher = share_leaves(make_dispatcher)
+
+            evaluator = AsyncScopeEvaluator(make_dispatcher,
+                                            conj_timeout=conj_timeout,
+                                            disj_hedge=disj_hedge,
+                                            disj_timeout=disj_timeout)
+            dispatcher: AsyncOidDispatcher[T] = await evaluator.evaluate(plan)
+            return dispatcher.result if dispatcher else None
+        return wrapper
+    return decorator
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from os import path
+from typing import List, Optional, Tuple
+
+import argparse
+import logging
+
+from .catalog import Service, ServiceCatalog, load_catalog
+from .configuration import SERVICES_CATALOG_PATH
+
+
+logger = logging.getLogger(__name__)
+
+
+# Names of the map files generated in the output directory.
+SERVICES_MAP = "oid-services.map"
+BACKENDS_MAP = "oid-backends.map"
+
+
+def get_backend_name(service: Service) -> str:
+    """Name of the HAProxy backend of a `service`, e.g., CloudOne_image_public.
+
+    """
+
+    return f"{service.cloud}_{service.service_type}_{service.interface}"
+
+
+def _strip_scheme(url: str) -> str:
+    return url.split("://", 1)[-1]
+
+
+def make_services_map(catalog: ServiceCatalog) -> List[Tuple[str, str]]:
+    """Map the URL prefix of every service to its service type and interface.
+
+    Prefixes are the URLs of the catalog without scheme, to match the `base`
+    sample fetch (Host header and path) of HAProxy. They are listed in the
+    order of the catalog: with `map_beg`, HAProxy returns the first matching
+    prefix, as `ServiceCatalog.find_by_url` does.
+
+    """
+
+    entries = []
+    seen = set()
+    for service in catalog.services:
+        prefix = _strip_scheme(service.url)
+        if prefix not in seen:
+            seen.add(prefix)
+            entries.append(
+                (prefix, f"{service.service_type}/{service.interface}"))
+
+    return entries
+
+
+def make_backends_map(catalog: ServiceCatalog) -> List[Tuple[str, str]]:
+    """Map every service type, interface and cloud to its HAProxy backend.
+
+    Keys are `<service type>/<interface>/<cloud>`, i.e., the value of the
+    services map followed by the cloud of the scope. Only the first service of
+    a key is kept, as `ServiceCatalog.find` does.
+
+    """
+
+    entries = []
+    seen = set()
+    for service in catalog.services:
+        key = f"{service.service_type}/{service.interface}/{service.cloud}"
+        if key not in seen:
+            seen.add(key)
+            entries.append((key, get_backend_name(service)))
+
+    return entries
+
+
+def write_map(entries: List[Tuple[str, str]], file_path: str,
+              source: str) -> None:
+    with open(file_path, 'w') as map_file:
+        map_file.write(f"# Generated by openstackoid from {source}\n")
+        for key, value in entries:
+            map_file.write(f"{key} {value}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Generate the HAProxy routing maps of a catalog of services.
+
+    E.g., generate the maps of the devstack catalog in /etc/haproxy with:
+
+    > python -m openstackoid.haproxy file:///etc/openstackoid/catalog.json \
+      /etc/haproxy
+
+    HAProxy then routes a request with two lookups, the targeted service from
+    its URL and the backend from the service and the cloud of the scope
+    (e.g., extracted from X-Scope in `txn.cloud`):
+
+    > http-request set-var(txn.service) base,map_beg(oid-services.map)
+    > use_backend %[var(txn.service),concat(/,txn.cloud),map(oid-backends.map)]
+
+    """
+
+    parser = argparse.ArgumentParser(description=main.__doc__.split("\n")[0])
+    parser.add_argument("catalog", nargs="?", default=SERVICES_CATALOG_PATH,
+                        help="url of the services catalog")
+    parser.add_argument("output", nargs="?", default=".",
+                        help="directory of the generated map files")
+    options = parser.parse_args(argv)
+
+    catalog = load_catalog(options.catalog)
+    for name, entries in [(SERVICES_MAP, make_services_map(catalog)),
+                          (BACKENDS_MAP, make_backends_map(catalog))]:
+        file_path = path.join(options.output, name)
+        write_map(entries, file_path, options.catalog)
+        logger.info(f"Write {len(entries)} entries in {file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from typing import Any, Callable, Dict, Optional
+
+from requests import exceptions
+
+import logging
+import threading
+import time
+
+from .configuration import (HEALTH_FAILURE_THRESHOLD, HEALTH_LATENCY_WEIGHT,
+                            HEALTH_RESET_TIMEOUT)
+
+
+logger = logging.getLogger(__name__)
+
+
+# States of the circuit breaker of a cloud.
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(exceptions.ConnectionError):
+    """A cloud is skipped because its circuit breaker is open.
+
+    A `requests` connection error, so that clients of `Session.send` (e.g.,
+    keystoneauth) handle it as an unreachable endpoint.
+
+    """
+
+    def __init__(self, cloud: str):
+        self.cloud = cloud
+        super().__init__(f"Circuit breaker of '{cloud}' is open.")
+
+
+class CloudHealth:
+    """Health of a cloud: circuit breaker state, failures and latency."""
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.latency: Optional[float] = None
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(state=self.state,
+                    failures=self.failures,
+                    total_failures=self.total_failures,
+                    total_successes=self.total_successes,
+                    latency=self.latency)
+
+
+class HealthRegistry:
+    """Thread-safe registry of the health of clouds, with a circuit breaker.
+
+    Executions on a cloud are recorded with their latency (see `track`). After
+    `failure_threshold` consecutive failures, the breaker of the cloud opens:
+    executions are refused (`acquire`) and the cloud is skipped in
+    disjunctions (`is_open`). Once `reset_timeout` seconds elapsed, the breaker
+    is half-open and a single execution probes the cloud: a success closes the
+    breaker, a failure opens it again. The state of every cloud is available
+    with `snapshot`.
+
+    """
+
+    def __init__(self,
+                 failure_threshold: int = HEALTH_FAILURE_THRESHOLD,
+                 reset_timeout: float = HEALTH_RESET_TIMEOUT,
+                 latency_weight: float = HEALTH_LATENCY_WEIGHT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_weight = latency_weight
+        self.clock = clock
+        self._clouds: Dict[str, CloudHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cloud: str) -> CloudHealth:
+        # Must be called with the lock held
+        health = self._clouds.get(cloud)
+        if health is None:
+            health = self._clouds[cloud] = CloudHealth()
+
+        return health
+
+    def _expired(self, health: CloudHealth) -> bool:
+        return health.opened_at + self.reset_timeout <= self.clock()
+
+    def _record_latency(self, health: CloudHealth, latency: float) -> None:
+        health.latency = latency if health.latency is None else (
+            self.latency_weight * latency
+            + (1 - self.latency_weight) * health.latency)
+
+    def is_open(self, cloud: str) -> bool:
+        """Test if executions on the `cloud` are refused, without probing."""
+
+        with self._lock:
+            health = self._clouds.get(cloud)
+            if health is None or health.state == CLOSED:
+                return False
+
+            if health.state == HALF_OPEN:
+                return health.probing
+
+            return not self._expired(health)
+
+    def acquire(self, cloud: str) -> bool:
+        """Ask for an execution on the `cloud`.
+
+        Returns `False` if the breaker of the `cloud` is open. Otherwise, the
+        execution must be recorded with `record_success` or `record_failure`,
+        or given up with `release`, in particular the one probing a half-open
+        breaker.
+
+        """
+
+        with self._lock:
+            health = self._get(cloud)
+            if health.state == OPEN and self._expired(health):
+                logger.info(f"Circuit breaker of '{cloud}' is half-open")
+                health.state = HALF_OPEN
+
+            if health.state == HALF_OPEN:
+                if health.probing:
+                    return False
+                health.probing = True
+
+            return health.state != OPEN
+
+    def release(self, cloud: str) -> None:
+        """Give up an execution on the `cloud` without recording it."""
+
+        with self._lock:
+            self._get(cloud).probing = False
+
+    def record_success(self, cloud: str, latency: float) -> None:
+        with self._lock:
+            health = self._get(cloud)
+            health.total_successes += 1
+            health.failures = 0
+            health.probing = False
+            self._record_latency(health, latency)
+            if health.state != CLOSED:
+                logger.info(f"Circuit breaker of '{cloud}' is closed")
+                health.state = CLOSED
+                health.opened_at = None
+
+    def record_failure(self, cloud: str,
+                       latency: Optional[float] = None) -> None:
+        with self._lock:
+            health = self._get(cloud)
+            health.total_failures += 1
+            health.failures += 1
+            health.probing = False
+            if latency is not None:
+                self._record_latency(health, latency)
+            if health.state == HALF_OPEN or \
+               health.failures >= self.failure_threshold:
+                if health.state != OPEN:
+                    logger.warning(f"Circuit breaker of '{cloud}' is open")
+                health.state = OPEN
+                health.opened_at = self.clock()
+
+    def track(self, cloud: str, func: Callable[..., Any], *arguments,
+              healthy: Callable[[Any], bool] = lambda result: True,
+              **keywords) -> Any:
+        """Execute the `func` on the `cloud` and record its outcome.
+
+        An exception, or a result that is not `healthy`, is a failure of the
+        `cloud`. Raise a `CircuitOpenError` without executing the `func` if
+        the breaker of the `cloud` is open.
+
+        """
+
+        if not self.acquire(cloud):
+            raise CircuitOpenError(cloud)
+
+        start = self.clock()
+        recorded = False
+        try:
+            try:
+                result = func(*arguments, **keywords)
+                success = healthy(result)
+            except Exception:
+                self.record_failure(cloud, self.clock() - start)
+                recorded = True
+                raise
+
+            if success:
+                self.record_success(cloud, self.clock() - start)
+            else:
+                self.record_failure(cloud, self.clock() - start)
+            recorded = True
+            return result
+        finally:
+            # An interrupted execution (e.g., KeyboardInterrupt) is not
+            # recorded, but releases the probe of a half-open breaker
+            if not recorded:
+                self.release(cloud)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the health of every cloud (see `CloudHealth.as_dict`)."""
+
+        with self._lock:
+            return {cloud: health.as_dict()
+                    for cloud, health in self._clouds.items()}
+
+    def reset(self, cloud: Optional[str] = None) -> None:
+        """Forget the health of the `cloud`, or of every cloud if `None`."""
+
+        with self._lock:
+            if cloud is None:
+                self._clouds.clear()
+            else:
+                self._clouds.pop(cloud, None)
+
+
+_registry: Optional[HealthRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_health_registry() -> HealthRegistry:
+    """Get the health registry shared by the scoped functions of a process."""
+
+    global _registry
+    with _registry_lock:
+        if not _registry:
+            _registry = HealthRegistry()
+    return _registry
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from typing import TypeVar, Union
+
+import copy
+import logging
+
+from requests import PreparedRequest, Request
+from requests.utils import rewind_body
+
+
+logger = logging.getLogger(__name__)
+
+
+R = TypeVar("R", Request, PreparedRequest)
+
+
+def clone_request(request: R) -> R:
+    """Copy a `request` without copying its body.
+
+    The url, headers, hooks and cookies of the clone are copies, so they can be
+    updated without altering the original `request`. The body (i.e., `body` of
+    a `PreparedRequest`, or `data`, `files` and `json` of a `Request`) is
+    shared, so cloning a request costs a constant memory regardless of the size
+    of its payload.
+
+    """
+
+    if isinstance(request, PreparedRequest):
+        # Copies the headers and cookies, shares the body
+        clone = request.copy()
+    else:
+        clone = copy.copy(request)
+        if request.headers is not None:
+            clone.headers = request.headers.copy()
+        if request.cookies is not None and hasattr(request.cookies, "copy"):
+            clone.cookies = request.cookies.copy()
+
+    if request.hooks is not None:
+        clone.hooks = {event: list(hooks)
+                       for event, hooks in request.hooks.items()}
+
+    return clone
+
+
+def is_stream_body(request: Union[Request, PreparedRequest]) -> bool:
+    """Test if the body of a prepared `request` is a stream.
+
+    A stream body (e.g., a file or a generator) is consumed when the request is
+    sent, as opposed to a body of bytes.
+
+    """
+
+    body = getattr(request, "body", None)
+    return body is not None and \
+        not isinstance(body, (str, bytes, bytearray, memoryview)) and \
+        (hasattr(body, "read") or hasattr(body, "__iter__"))
+
+
+def rewind_shared_body(request: Union[Request, PreparedRequest]) -> None:
+    """Rewind the body of a (cloned) `request` if it is a stream.
+
+    A stream body shared between clones of a `PreparedRequest` is consumed when
+    one of them is sent. Rewinding it to its recorded starting position makes
+    it readable again by the next clone. Other bodies are left untouched.
+
+    """
+
+    position = getattr(request, "_body_position", None)
+    if isinstance(position, int) and hasattr(request.body, "seek"):
+        logger.debug(f"Rewind request body to {position}")
+        rewind_body(request)
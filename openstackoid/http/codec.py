@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from types import MappingProxyType
+from typing import (Dict, Iterable, List, Mapping, MutableMapping, Optional,
+                    Tuple)
+
+import functools
+import json
+import re
+import threading
+import weakref
+import zlib
+
+from ..catalog import Service, ServiceCatalog
+from ..configuration import SCOPE_CODEC_CACHE_SIZE
+
+
+# Prefix and version of the compact format of scopes. A json scope always
+# starts with '{', hence the prefix tells the two formats apart.
+COMPACT_SCOPE_PREFIX = "~"
+COMPACT_SCOPE_VERSION = 1
+
+
+# Tokens of a scope expression: cloud names and operators.
+_SCOPE_TOKEN = re.compile(r"\w+|\S")
+_SCOPE_OPERATORS = "&|()"
+
+
+class CompactScopeCodec:
+    """Compact format of scopes, derived from a catalog of services.
+
+    Service types and cloud names are replaced by their index in the sorted
+    list of service types and cloud names of the catalog. For instance, with a
+    catalog of the identity and image services in CloudOne and CloudTwo, the
+    scope `{"identity": "CloudOne", "image": "CloudOne | CloudTwo"}` is
+    encoded as `~1:<digest>:0.0,1.0|1`, i.e., the prefix, the version, the
+    digest of the catalog indexes and the service type/cloud pairs.
+
+    The digest ensures that a scope is decoded with the very indexes it has
+    been encoded with, so every service of a deployment must share the same
+    catalog to use the compact format.
+
+    """
+
+    def __init__(self, service_types: Iterable[str], clouds: Iterable[str]):
+        self.service_types: List[str] = sorted(set(service_types))
+        self.clouds: List[str] = sorted(set(clouds))
+        self._service_type_ids = {t: str(i)
+                                  for i, t in enumerate(self.service_types)}
+        self._cloud_ids = {c: str(i) for i, c in enumerate(self.clouds)}
+
+        indexes = "\n".join(self.service_types + [""] + self.clouds)
+        self.digest = f"{zlib.crc32(indexes.encode()):08x}"
+        self.prefix = (f"{COMPACT_SCOPE_PREFIX}{COMPACT_SCOPE_VERSION}:"
+                       f"{self.digest}:")
+
+    @classmethod
+    def from_services(cls, services: List[Service]) -> 'CompactScopeCodec':
+        return cls((s.service_type for s in services),
+                   (s.cloud for s in services))
+
+    def _encode_value(self, value: str) -> Optional[str]:
+        if not isinstance(value, str):
+            return None
+
+        tokens = []
+        for token in _SCOPE_TOKEN.findall(value):
+            if token in _SCOPE_OPERATORS:
+                tokens.append(token)
+            elif token in self._cloud_ids:
+                tokens.append(self._cloud_ids[token])
+            else:
+                return None
+
+        return "".join(tokens)
+
+    def encode(self, items: Iterable[Tuple[str, str]]) -> Optional[str]:
+        """Encode the `items` of a scope.
+
+        Returns `None` if the scope refers to a service type or a cloud unknown
+        to the catalog, or if a value is not a scope expression.
+
+        """
+
+        pairs = []
+        for service_type, value in items:
+            service_type_id = self._service_type_ids.get(service_type)
+            value_id = self._encode_value(value)
+            if service_type_id is None or value_id is None:
+                return None
+
+            pairs.append(f"{service_type_id}.{value_id}")
+
+        return self.prefix + ",".join(pairs)
+
+    def _decode_value(self, value: str) -> str:
+        expression = " ".join(
+            token if token in _SCOPE_OPERATORS else self.clouds[int(token)]
+            for token in _SCOPE_TOKEN.findall(value))
+        return expression.replace("( ", "(").replace(" )", ")")
+
+    def decode(self, value: str) -> Dict[str, str]:
+        """Decode a compact scope, see `encode`."""
+
+        scope = {}
+        pairs = value[len(self.prefix):]
+        try:
+            for pair in pairs.split(",") if pairs else []:
+                service_type_id, value_id = pair.split(".", 1)
+                service_type = self.service_types[int(service_type_id)]
+                scope[service_type] = self._decode_value(value_id)
+        except (IndexError, ValueError):
+            raise ValueError(f"Invalid compact scope: {value}")
+
+        return scope
+
+
+# Compact codecs known to decode scopes, by catalog. A codec is only built on
+# first use (`None` until then), and is dropped along with its catalog.
+_COMPACT_CODECS: MutableMapping[ServiceCatalog, Optional[CompactScopeCodec]] \
+    = weakref.WeakKeyDictionary()
+_COMPACT_CODECS_LOCK = threading.Lock()
+
+# Default compact codec to encode scopes (the compact format is disabled if
+# `None`), for callers of `encode_scope` that do not pass a codec.
+_wire_codec: Optional[CompactScopeCodec] = None
+
+
+def use_compact_scope(codec: Optional[CompactScopeCodec]) -> None:
+    """Encode scopes in the compact format of `codec` (json if `None`) when
+    `encode_scope` is not given a codec.
+
+    """
+
+    global _wire_codec
+
+    if _wire_codec is not codec:
+        _wire_codec = codec
+        _encode_scope_items.cache_clear()
+
+
+def register_scope_codec(catalog: ServiceCatalog) -> None:
+    """Register the compact codec derived from a `catalog` of services.
+
+    Scopes in the compact format of any registered catalog can then be
+    decoded. The codec is built on the first encoding or decoding that needs
+    it (see `get_scope_codec`), so the services of a lazy catalog are not
+    loaded beforehand. The codec is dropped with the catalog, or with
+    `unregister_scope_codec`.
+
+    """
+
+    with _COMPACT_CODECS_LOCK:
+        _COMPACT_CODECS.setdefault(catalog, None)
+
+
+def unregister_scope_codec(catalog: ServiceCatalog) -> None:
+    with _COMPACT_CODECS_LOCK:
+        _COMPACT_CODECS.pop(catalog, None)
+
+
+def get_scope_codec(catalog: ServiceCatalog) -> CompactScopeCodec:
+    """Get the compact codec of a `catalog`, registered (and built) if needed.
+
+    """
+
+    with _COMPACT_CODECS_LOCK:
+        codec = _COMPACT_CODECS.get(catalog)
+    if codec is None:
+        codec = CompactScopeCodec.from_services(catalog.services)
+        with _COMPACT_CODECS_LOCK:
+            _COMPACT_CODECS[catalog] = codec
+
+    return codec
+
+
+def _find_scope_codec(digest: str) -> Optional[CompactScopeCodec]:
+    with _COMPACT_CODECS_LOCK:
+        catalogs = list(_COMPACT_CODECS.keys())
+
+    for catalog in catalogs:
+        codec = get_scope_codec(catalog)
+        if codec.digest == digest:
+            return codec
+
+    return None
+
+
+def _decode_compact_scope(value: str) -> Dict[str, str]:
+    header = value[len(COMPACT_SCOPE_PREFIX):].split(":", 2)
+    if len(header) < 3 or header[0] != str(COMPACT_SCOPE_VERSION):
+        raise ValueError(f"Unsupported compact scope version: {value}")
+
+    codec = _find_scope_codec(header[1])
+    if not codec:
+        raise ValueError(f"Compact scope from an unknown catalog: {value}")
+
+    return codec.decode(value)
+
+
+@functools.lru_cache(maxsize=SCOPE_CODEC_CACHE_SIZE)
+def decode_scope(value: str) -> Mapping[str, str]:
+    """Parse a serialized scope (e.g., the value of 'X-Scope').
+
+    The scope is either in json or in the compact format (see
+    `CompactScopeCodec`). Parsed scopes are kept in a bounded LRU cache keyed
+    by the serialized scope, so they are immutable: copy them with `dict`
+    before any update. Use `decode_scope.cache_info()` to get the hit/miss
+    counters of the cache.
+
+    """
+
+    if value.startswith(COMPACT_SCOPE_PREFIX):
+        return MappingProxyType(_decode_compact_scope(value))
+
+    return MappingProxyType(json.loads(value))
+
+
+@functools.lru_cache(maxsize=SCOPE_CODEC_CACHE_SIZE)
+def _encode_scope_items(items: Tuple[Tuple[str, str], ...],
+                        codec: Optional[CompactScopeCodec]) -> str:
+    value = codec.encode(items) if codec else None
+    return value if value is not None else json.dumps(dict(items))
+
+
+def encode_scope(scope: Mapping[str, str],
+                 codec: Optional[CompactScopeCodec] = None) -> str:
+    """Serialize a scope (e.g., for the value of 'X-Scope').
+
+    The scope is serialized in json, unless it is encoded in the compact
+    format of `codec` (by default, the one of `use_compact_scope`, if any) and
+    this format applies to the scope. Serialized scopes are kept in a bounded
+    LRU cache keyed by the items of the scope and the codec, see
+    `encode_scope.cache_info()`.
+
+    """
+
+    items = tuple(scope.items())
+    try:
+        return _encode_scope_items(items, codec or _wire_codec)
+    except TypeError:
+        # Unhashable values are not cached
+        return json.dumps(dict(items))
+
+
+encode_scope.cache_info = _encode_scope_items.cache_info
+encode_scope.cache_clear = _encode_scope_items.cache_clear
@@ -7,16 +7,16 @@
 # Make your OpenStacks Collaborative
 
 
-from typing import Dict
-
-import copy
-import json
+from typing import Any, Dict, Hashable, Iterator, Mapping, Optional, Tuple
 
 from requests import Request
 from urllib import parse
 
 import six
 
+from .clone import clone_request
+from .codec import decode_scope, encode_scope
+
 
 SCOPE_DELIMITER = "!SCOPE!"
 
@@ -36,6 +36,94 @@ X_SCOPE = "X-Scope"
 X_SUBJECT_TOKEN = "X-Subject-Token"
 
 
+def _sanitize_key(k: Any) -> Any:
+    if six.PY3:
+        return k.decode('ASCII') if isinstance(k, six.binary_type) else k
+
+    return k.encode('ASCII') if isinstance(k, six.text_type) else k
+
+
+def _sanitize_value(v: Any) -> Any:
+    if v is None:
+        return v
+
+    if six.PY3:
+        v = v.decode('ASCII') if isinstance(v, six.binary_type) else v
+    else:
+        v = v.encode('ASCII') if isinstance(v, six.text_type) else v
+
+    # decode url strings with special characters
+    return parse.unquote(v)
+
+
+class HeaderView(Mapping):
+    """Read-only view of headers sanitized on demand.
+
+    The view applies the same sanitization as `sanitize_headers`, but only to
+    the headers actually read. A sanitized value is cached as long as the raw
+    value of its header is unchanged, so reading the same header several times
+    decodes it once.
+
+    """
+
+    def __init__(self, headers: Mapping):
+        self.headers = headers
+        self._sanitized: Dict[Hashable, Tuple[Any, Any]] = {}
+
+    def raw_key(self, key: str) -> Optional[Any]:
+        """Get the key of the raw header named `key`, if any.
+
+        The key may be either textual or binary in the raw headers.
+
+        """
+
+        if key in self.headers:
+            return key
+
+        binary_key = key.encode('ASCII') if six.PY3 else key.decode('ASCII')
+        return binary_key if binary_key in self.headers else None
+
+    def __getitem__(self, key: str) -> Any:
+        raw_key = self.raw_key(key)
+        if raw_key is None:
+            raise KeyError(key)
+
+        raw_value = self.headers[raw_key]
+        cached = self._sanitized.get(key)
+        if cached and cached[0] is raw_value:
+            return cached[1]
+
+        value = _sanitize_value(raw_value)
+        self._sanitized[key] = (raw_value, value)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.raw_key(key) is not None
+
+    def __iter__(self) -> Iterator:
+        return (_sanitize_key(k) for k in self.headers)
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+
+def get_header_view(request: Request) -> HeaderView:
+    """Get the `HeaderView` of the headers of a `request`.
+
+    The view is kept with the `request` for its lifetime (as long as its
+    headers are not replaced), so all the readers of a header share its
+    sanitized value.
+
+    """
+
+    view = getattr(request, "_oid_header_view", None)
+    if view is None or view.headers is not request.headers:
+        view = HeaderView(request.headers)
+        request._oid_header_view = view
+
+    return view
+
+
 def sanitize_headers(headers: Dict) -> Dict[str, str]:
     """Sanitize the key/value encoding of a dictionary.
 
@@ -47,21 +135,7 @@ def sanitize_headers(headers: Dict) -> Dict[str, str]:
 
     str_dict = {}
     for k, v in headers.items():
-        if six.PY3:
-            k = k.decode('ASCII') if isinstance(k, six.binary_type) else k
-            if v is not None:
-                v = v.decode('ASCII') if isinstance(v, six.binary_type) else v
-
-                # decode url strings with special characters
-                v = parse.unquote(v)
-
-        else:
-            k = k.encode('ASCII') if isinstance(k, six.text_type) else k
-            if v is not None:
-                v = v.encode('ASCII') if isinstance(v, six.text_type) else v
-                v = parse.unquote(v)
-
-        str_dict[k] = v
+        str_dict[_sanitize_key(k)] = _sanitize_value(v)
 
     return str_dict
 
@@ -73,26 +147,27 @@ def update_service_scope(service_type: str,
     Immutable method to update the scope found in the headers of a `request`,
     when is set. It returns a new `Request` with the updated scope for the
     provided service type. This method does NOT set any default scope if it is
-    not already available in the headers.
+    not already available in the headers. The body of `request` is shared with
+    the returned request (see `clone_request`).
 
     """
 
-    _request = copy.deepcopy(request)
-    headers = sanitize_headers(_request.headers)
+    _request = clone_request(request)
+    headers = HeaderView(_request.headers)
     if X_SCOPE in headers:
         scope_value = headers[X_SCOPE]
-        current_scope = json.loads(scope_value)
+        current_scope = dict(decode_scope(scope_value))
         current_scope.update({service_type: scope})
-        x_scope = json.dumps(current_scope)
+        x_scope = encode_scope(current_scope)
         _request.headers.update({X_SCOPE: x_scope})
 
     if X_AUTH_TOKEN in headers:
         token = headers[X_AUTH_TOKEN]
         if SCOPE_DELIMITER in token:
             token, scope_value = token.split(SCOPE_DELIMITER)
-            current_scope = json.loads(scope_value)
+            current_scope = dict(decode_scope(scope_value))
             current_scope.update({service_type: scope})
-            scope_value = json.dumps(current_scope)
+            scope_value = encode_scope(current_scope)
             x_auth_token = f"{token}{SCOPE_DELIMITER}{scope_value}"
             _request.headers.update({X_AUTH_TOKEN: x_auth_token})
 
@@ -7,14 +7,18 @@
 # Make your OpenStacks Collaborative
 
 
+from typing import Optional
+
 from requests import Response, Session
 
-import json
 import logging
 
-from .headers import SCOPE_DELIMITER, X_AUTH_TOKEN, X_SCOPE, sanitize_headers
+from .codec import CompactScopeCodec, encode_scope
+from .headers import SCOPE_DELIMITER, X_AUTH_TOKEN, X_SCOPE, HeaderView
 from .hooks import print_request_info
-from ..configuration import get_shell_scope, get_execution_scope
+from ..configuration import (SCOPE_WIRE_FORMAT, SERVICES_CATALOG_PATH,
+                             get_execution_scope, get_shell_scope)
+from ..interpreter import get_interpreter
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,20 @@ logger = logging.getLogger(__name__)
 session_request = Session.request
 
 
+def get_wire_codec() -> Optional[CompactScopeCodec]:
+    """Get the codec of the configured `SCOPE_WIRE_FORMAT`, if compact.
+
+    The codec is the one of the interpreter of the services catalog (see
+    `SERVICES_CATALOG_PATH`), so it follows the reloads of the catalog.
+
+    """
+
+    if SCOPE_WIRE_FORMAT != "compact":
+        return None
+
+    return get_interpreter(SERVICES_CATALOG_PATH).wire_codec
+
+
 def _session_request_monkey_patch(cls, method, url, **kwargs) -> Response:
     """Piggyback the scope on headers of the `Session.request` method.
 
@@ -30,23 +48,26 @@ def _session_request_monkey_patch(cls, method, url, **kwargs) -> Response:
 
     logger.warning("Monkey patching 'Session.request'")
     headers = kwargs.pop("headers")
-    headers = sanitize_headers(headers) if headers else {}
+    headers = dict(headers) if headers else {}
+    header_view = HeaderView(headers)
     shell_scope = get_shell_scope()
     execution_scope = get_execution_scope()
     if execution_scope:
         service_type = execution_scope[0]
         shell_scope.update({service_type: execution_scope[1]})
 
-    scope_value = json.dumps(shell_scope)
+    scope_value = encode_scope(shell_scope, get_wire_codec())
 
     # Set the scope in the X-Scope header (there is always a scope)
     headers[X_SCOPE] = scope_value
     logger.info(f"Set the X-Scope header with {scope_value}")
 
-    # Piggyback the scope within the X-Auth-Token header
-    if X_AUTH_TOKEN in headers:
-        token = headers[X_AUTH_TOKEN]
+    # Piggyback the scope within the X-Auth-Token header. Only this header is
+    # sanitized, others are sent as is
+    if X_AUTH_TOKEN in header_view:
+        token = header_view[X_AUTH_TOKEN]
         x_auth_token = f"{token}{SCOPE_DELIMITER}{scope_value}"
+        del headers[header_view.raw_key(X_AUTH_TOKEN)]
         headers[X_AUTH_TOKEN] = x_auth_token
         logger.info(f"Update the X-Auth-Token by appending the scope")
 
@@ -9,12 +9,11 @@
 
 from typing import Dict, Optional, Tuple
 
-import functools
-
-from requests import PreparedRequest
+from requests import PreparedRequest, Response
 
+from .clone import is_stream_body, rewind_shared_body
 from .hooks import print_request_info
-from ..dispatcher import scope
+from ..dispatcher import compile_scope, scope
 from ..interpreter import OidInterpreter
 from ..utils import get_from_tuple, update_tuple
 
@@ -33,22 +32,70 @@ def send_extr_scp_func(interpreter: OidInterpreter,
     return service_type, service_scope
 
 
+def send_concurrent_extr_scp_func(interpreter: OidInterpreter,
+                                  *arguments, **keywords) -> Optional[Tuple]:
+    """Extract the execution scope of a HTTP request sent concurrently.
+
+    Same as `send_extr_scp_func`, but reject a request with a stream body
+    targeting several endpoints: the clones of the request share the stream,
+    which cannot be read by several endpoints at the same time.
+
+    """
+
+    service_type, service_scope = send_extr_scp_func(
+        interpreter, *arguments, **keywords)
+    request = get_from_tuple(PreparedRequest, arguments)
+    if is_stream_body(request) and \
+       len(set(compile_scope(service_scope).endpoints())) > 1:
+        raise ValueError("A stream body cannot be sent concurrently to "
+                         f"several endpoints ({service_scope}), send bytes "
+                         "instead or disable conj_parallel and disj_hedge")
+
+    return service_type, service_scope
+
+
 def send_args_xfm_func(interpreter: OidInterpreter, endpoint: str,
                        *arguments, **keywords) -> Tuple[Tuple, Dict]:
     """Transform the original arguments send with a HTTP request.
 
-    Interpret the and change the request address according the scope.
+    Interpret the and change the request address according the scope. The
+    interpreted request shares the body of the original one, a stream body is
+    rewound so it can be sent once per endpoint.
 
     """
 
     request = get_from_tuple(PreparedRequest, arguments)
     interpreted = interpreter.iinterpret(request, endpoint=endpoint)
+    rewind_shared_body(interpreted)
     interpreted.register_hook('response', print_request_info)
     args = update_tuple(request, interpreted, arguments)
     return args, keywords
 
 
-# Partial function of the scope decorator for the 'requests.Send' method
-send_scope = functools.partial(scope,
-                               extr_scp_func=send_extr_scp_func,
-                               args_xfm_func=send_args_xfm_func)
+def send_health_evl_func(response: Response) -> bool:
+    """Evaluate the health of an endpoint from the response of a request.
+
+    A server error (5xx) is a failure of the endpoint, as a connection error
+    is, while a client error (4xx) is a healthy answer.
+
+    """
+
+    return response.status_code < 500
+
+
+def send_scope(interpreter: OidInterpreter, **keywords):
+    """Partial function of the scope decorator for the 'requests.Send' method.
+
+    When the endpoints are requested concurrently (`conj_parallel` or
+    `disj_hedge`), a request with a stream body is rejected (see
+    `send_concurrent_extr_scp_func`).
+
+    """
+
+    concurrent = keywords.get("conj_parallel") or \
+        keywords.get("disj_hedge") is not None
+    keywords.setdefault("extr_scp_func", send_concurrent_extr_scp_func
+                        if concurrent else send_extr_scp_func)
+    keywords.setdefault("args_xfm_func", send_args_xfm_func)
+    keywords.setdefault("health_evl_func", send_health_evl_func)
+    return scope(interpreter, **keywords)
@@ -7,69 +7,195 @@
 # Make your OpenStacks Collaborative
 
 
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, NewType, Tuple
-from os import path
+from types import MappingProxyType
+from typing import (Callable, Dict, List, Mapping, NamedTuple, Optional,
+                    NewType, Tuple)
 
 from requests import Request
 from urllib import parse
 
-import copy
-import json
 import logging
-
+import threading
+
+from .catalog import (CatalogWatcher, Service, ServiceCatalog,
+                      get_catalog_version, load_catalog)
+from .configuration import (REWRITE_CACHE_SIZE, SCOPE_WIRE_FORMAT,
+                            SERVICES_CATALOG_RELOAD_INTERVAL)
+from .http.clone import clone_request
+from .http.codec import (CompactScopeCodec, decode_scope, encode_scope,
+                         get_scope_codec, register_scope_codec,
+                         unregister_scope_codec)
 from .http.headers import (SCOPE_DELIMITER, X_AUTH_TOKEN, X_IDENTITY_CLOUD,
                            X_IDENTITY_URL, X_SCOPE, X_SUBJECT_TOKEN,
-                           sanitize_headers)
+                           get_header_view)
+from .utils import LRUCache
 
 
 logger = logging.getLogger(__name__)
 
 
-Scope = NewType('Scope', Dict[str, str])
+Scope = NewType('Scope', Mapping[str, str])
 
 
 SCOPE_INTERPRETERS: Dict = {}
+SCOPE_INTERPRETERS_LOCK = threading.Lock()
+
 
+class Rewrite(NamedTuple):
+    """Translation of the requests of a service to another cloud.
 
-@dataclass
-class Service:
-    service_type: str
-    cloud: str
-    url: str
-    interface: str
+    The url `prefix` of the service is replaced by the url `replacement` of
+    the targeted service, and the `headers` are added to the request (the
+    identity headers for the `keystonemiddleware`, if the service is an
+    identity one).
+
+    """
 
+    prefix: str
+    replacement: str
+    headers: Mapping[str, str]
 
-def _oss2services(services: List[Dict[str, str]]) -> List[Service]:
-    """Transform a list of OpenStack services into a list of type `Service`.
+    def apply(self, url: str) -> str:
+        return self.replacement + url[len(self.prefix):]
 
-    A list of OpenStack services may be obtained with:
 
-    > openstack endpoint list --format json \
-      -c "Service Type" -c "Interface" -c "URL" -c "Region"
+class _CatalogState(NamedTuple):
+    """Catalog of services of an interpreter, with the cache of its rewrites.
 
-    And then transformed into a python `dict` with `json.load`.
+    Both are swapped together, as a single reference, on a catalog update.
 
     """
 
-    return [Service(service_type=s["Service Type"],
-                    cloud=s["Region"],
-                    url=s["URL"],
-                    interface=s["Interface"])
-            for s in services]
+    catalog: ServiceCatalog
+    rewrites: LRUCache
+
+
+def make_identity_headers(catalog: ServiceCatalog,
+                          cloud: str) -> Mapping[str, str]:
+    """Compute the identity headers of `cloud` for the `keystonemiddleware`.
+
+    Returns no header if `cloud` has no admin identity service.
+
+    """
+
+    id_service = catalog.find("identity", "admin", cloud)
+    if not id_service:
+        return MappingProxyType({})
+
+    return MappingProxyType({X_IDENTITY_CLOUD: id_service.cloud,
+                             X_IDENTITY_URL: id_service.url})
+
+
+def make_rewrite(catalog: ServiceCatalog, service: Service,
+                 cloud: str) -> Optional[Rewrite]:
+    """Compute the `Rewrite` of the requests of `service` to `cloud`.
+
+    Returns `None` if `cloud` has no service of the same type and interface.
+
+    """
+
+    targeted_service = catalog.find(service.service_type, service.interface,
+                                    cloud)
+    if not targeted_service:
+        return None
+
+    headers = (make_identity_headers(catalog, cloud)
+               if service.service_type == "identity"
+               else MappingProxyType({}))
+    return Rewrite(service.url, targeted_service.url, headers)
 
 
 class OidInterpreter:
     """Interpret the `Scope` in a `Request` and update it."""
 
-    def __init__(self, services: List[Service]):
+    def __init__(self, services: List[Service],
+                 catalog: Optional[ServiceCatalog] = None,
+                 wire_format: str = SCOPE_WIRE_FORMAT):
         """
         Private: Use `get_interpreter instead`.
 
+        The `catalog` of the `services`, if already built. The `wire_format`
+        of scopes is either "json" or "compact" (see `SCOPE_WIRE_FORMAT`).
+
         """
 
         logging.debug(f'New OidInterpreter instance')
-        self.services = services
+        if wire_format not in ("json", "compact"):
+            raise ValueError(f"Unsupported scope wire format: {wire_format}")
+
+        self.wire_format = wire_format
+        self.watcher: Optional[CatalogWatcher] = None
+        self._state: Optional[_CatalogState] = None
+        self.update_catalog(catalog if catalog is not None
+                            else ServiceCatalog(services))
+
+    @classmethod
+    def from_catalog(cls, catalog: ServiceCatalog,
+                     wire_format: str = SCOPE_WIRE_FORMAT) -> "OidInterpreter":
+        """Private: Use `get_interpreter instead`.
+
+        Build an interpreter on an already built `catalog`.
+
+        """
+
+        return cls([], catalog=catalog, wire_format=wire_format)
+
+    @property
+    def catalog(self) -> ServiceCatalog:
+        return self._state.catalog
+
+    @property
+    def rewrites(self) -> LRUCache:
+        return self._state.rewrites
+
+    @property
+    def services(self) -> List[Service]:
+        return self.catalog.services
+
+    def update_catalog(self, catalog: ServiceCatalog) -> None:
+        """Swap the catalog of services of the interpreter.
+
+        The swap is atomic: a lookup uses either the previous or the new
+        catalog, which is fully built beforehand. The rewrites of the previous
+        catalog are dropped with it (see `get_rewrite`), and its resources
+        (e.g., a SQLite connection) are released.
+
+        """
+
+        # Compact scopes are derived from the catalog, register its codec
+        # (built on first use) beforehand so that scopes of the new catalog
+        # are understood, and drop the one of the previous catalog
+        previous = self._state.catalog if self._state else None
+        register_scope_codec(catalog)
+        self._state = _CatalogState(catalog, LRUCache(REWRITE_CACHE_SIZE))
+        if previous is not None and previous is not catalog:
+            unregister_scope_codec(previous)
+            previous.close()
+        logging.debug(f"Catalog updated with {len(catalog)} services")
+
+    @property
+    def wire_codec(self) -> Optional[CompactScopeCodec]:
+        """Codec of the scopes sent by the interpreter, `None` for json."""
+
+        if self.wire_format != "compact":
+            return None
+
+        return get_scope_codec(self.catalog)
+
+    def get_rewrite(self, service: Service, cloud: str) -> Optional[Rewrite]:
+        """Get the `Rewrite` of the requests of `service` to `cloud`.
+
+        Rewrites are computed on demand (see `make_rewrite`) and kept in a
+        bounded cache keyed by the url of the service and the cloud.
+
+        """
+
+        # A single read, so that the rewrites of a catalog are only cached
+        # along with it, even during a concurrent update
+        catalog, rewrites = self._state
+        return rewrites.get_or_create(
+            (service.url, cloud),
+            lambda: make_rewrite(catalog, service, cloud))
 
     def lookup_service(self, predicate: Callable[[Service], bool]) -> Service:
         """Find the first `Service` that satisfies the `predicate`.
@@ -96,13 +222,9 @@ class OidInterpreter:
 
         """
 
-        service = None
-        try:
-            service = self.lookup_service(
-                lambda s: request.url.startswith(s.url))
-        finally:
-            logging.debug(f"Scoped URL service: {service}")
-            return service
+        service = self.catalog.find_by_url(request.url)
+        logging.debug(f"Scoped URL service: {service}")
+        return service
 
     def get_scope(self, request: Request) -> Optional[Scope]:
         """Find the `Scope` from a `Request`.
@@ -116,17 +238,17 @@ class OidInterpreter:
         current_scope = None
         logger.info(request.url)
         logger.info(request.headers)
-        headers = sanitize_headers(request.headers)
+        headers = get_header_view(request)
 
         if X_SCOPE in headers:
             scope_value = headers[X_SCOPE]
-            current_scope = json.loads(scope_value)
+            current_scope = decode_scope(scope_value)
             logging.debug("Get scope from X-Scope")
         if X_AUTH_TOKEN in headers:
             token = headers[X_AUTH_TOKEN]
             if SCOPE_DELIMITER in token:
                 token, scope_value = token.split(SCOPE_DELIMITER)
-                current_scope = json.loads(scope_value)
+                current_scope = decode_scope(scope_value)
                 logging.debug("Get scope from X-Auth-Token")
 
         if not current_scope:
@@ -141,23 +263,23 @@ class OidInterpreter:
         logger.info(request.url)
         logger.info(request.headers)
         final_scope = get_default_scope()
-        headers = sanitize_headers(request.headers)
+        headers = get_header_view(request)
         if X_SCOPE in headers:
             scope_value = headers[X_SCOPE]
-            current_scope = json.loads(scope_value)
+            current_scope = decode_scope(scope_value)
             final_scope = dict(final_scope, **current_scope)
-            x_scope = json.dumps(final_scope)
+            x_scope = encode_scope(final_scope, self.wire_codec)
             request.headers.update({X_SCOPE: x_scope})
             logging.debug("Set scope from X-Scope")
         if X_AUTH_TOKEN in headers:
             token = headers[X_AUTH_TOKEN]
             if SCOPE_DELIMITER in token:
                 token, scope_value = token.split(SCOPE_DELIMITER)
-                current_scope = json.loads(scope_value)
+                current_scope = decode_scope(scope_value)
                 final_scope = dict(final_scope, **current_scope)
                 logging.debug("Set scope from X-Auth-Token")
 
-            scope_value = json.dumps(final_scope)
+            scope_value = encode_scope(final_scope, self.wire_codec)
             x_auth_token = f"{token}{SCOPE_DELIMITER}{scope_value}"
             request.headers.update({X_AUTH_TOKEN: x_auth_token})
 
@@ -175,7 +297,7 @@ class OidInterpreter:
 
         """
 
-        headers = sanitize_headers(request.headers)
+        headers = get_header_view(request)
         if token_header_name in headers:
             auth_token = headers[token_header_name]
             if SCOPE_DELIMITER in auth_token:
@@ -217,7 +339,6 @@ class OidInterpreter:
 
         # Find the targeted cloud
         targeted_service_type = service.service_type
-        targeted_interface = service.interface
 
         # In simple situations (when the scope does not contain an expression,
         # i.e., scope without operators) the cloud endpoint is the name of the
@@ -225,23 +346,30 @@ class OidInterpreter:
         targeted_cloud = endpoint if endpoint else scope[targeted_service_type]
         logging.debug(f"Effective endpoint: {targeted_cloud}")
 
-        # From targeted cloud, find the targeted service
-        targeted_service = self.lookup_service(
-            lambda s:
-                s.interface == targeted_interface and
-                s.service_type == targeted_service_type and
-                s.cloud == targeted_cloud)
+        # From targeted cloud, find the rewrite to the targeted service
+        rewrite = self.get_rewrite(service, targeted_cloud)
+        if not rewrite:
+            logging.error(f"No service found during lookup")
+            raise StopIteration
 
         # Update request
         # 1. Change url
-        request.url = request.url.replace(service.url, targeted_service.url)
+        request.url = rewrite.apply(request.url)
         # 2. Remove scope from token
         self.clean_token_header(request, X_SUBJECT_TOKEN)
         if targeted_service_type == "identity":
             self.clean_token_header(request, X_AUTH_TOKEN)
 
-        # 3. Update contents
-        request.headers.update({X_SCOPE: json.dumps(scope)})
+        # 3. Update contents, the scope piggybacked on the token is encoded
+        # in the wire format too
+        scope_value = encode_scope(scope, self.wire_codec)
+        request.headers.update({X_SCOPE: scope_value})
+        headers = get_header_view(request)
+        if X_AUTH_TOKEN in headers and \
+           SCOPE_DELIMITER in headers[X_AUTH_TOKEN]:
+            token, _ = headers[X_AUTH_TOKEN].split(SCOPE_DELIMITER)
+            x_auth_token = f"{token}{SCOPE_DELIMITER}{scope_value}"
+            request.headers.update({X_AUTH_TOKEN: x_auth_token})
 
         # HACK: Find the identity service. This part is used later to add
         # helpful headers to tweak the `keystonemiddleware`.
@@ -250,57 +378,62 @@ class OidInterpreter:
         # default scope
         if targeted_service_type == "identity":
             identity_scope = scope["identity"]
-            try:
-                id_service = self.lookup_service(
-                    lambda s:
-                        s.interface == "admin" and
-                        s.service_type == "identity" and
-                        s.cloud == identity_scope)
-
-                request.headers.update({
-                    X_IDENTITY_CLOUD: id_service.cloud,
-                    X_IDENTITY_URL: id_service.url
-                })
-                logger.debug(f"Update headers {X_IDENTITY_CLOUD} "
-                             f"and {X_IDENTITY_URL}")
-            except StopIteration:
+            headers = rewrite.headers
+            if identity_scope != targeted_cloud:
+                headers = make_identity_headers(self.catalog, identity_scope)
+            if not headers:
                 logging.error(f"Invalid identity scope: {identity_scope}")
                 raise ValueError
 
+            request.headers.update(headers)
+            logger.debug(f"Update headers {X_IDENTITY_CLOUD} "
+                         f"and {X_IDENTITY_URL}")
+
     def iinterpret(self, request: Request, endpoint: str = None) -> Request:
         """Immutable version of `interpret`.
 
+        The body of `request` is shared with the returned request (see
+        `clone_request`).
+
         """
-        _request = copy.deepcopy(request)
+        _request = clone_request(request)
         self.interpret(_request, endpoint=endpoint)
         return _request
 
 
-def get_interpreter(url: str) -> OidInterpreter:
+def get_interpreter(url: str,
+                    reload_interval: float = SERVICES_CATALOG_RELOAD_INTERVAL,
+                    wire_format: str = SCOPE_WIRE_FORMAT) -> OidInterpreter:
     """Instantiate a new OidInterpreter loading services from an abstract path.
 
     This method is a factory. The `url` is the path to the services list. In
     absence of scheme, the default one is `file://`. The uri targets a json
-    file.
+    file, a SQLite database (`sqlite://`) or a binary snapshot (`snapshot://`),
+    see `catalog.load_services`.
 
-    Right now, we only support filepath uri.
+    The catalog is then watched, and reloaded in the background if it changes,
+    every `reload_interval` seconds (0 disables the watch). Scopes are
+    encoded in the `wire_format` ("json" or "compact").
 
     """
 
-    services: List[Service] = []
     uri = parse.urlparse(url)
-    if uri not in SCOPE_INTERPRETERS:
-        # Interpret the uri to get the service list. E.g.,
-        # if uri.scheme == 'sql', uri.scheme == 'file' ...
-        # Right now, we only support filepath uri
-        file_path = path.abspath(''.join([uri.netloc, uri.path]))
-        with open(file_path, 'r') as json_file:
-            _services = json.load(json_file)
-            services = _oss2services(_services)
-            logging.debug(f"Load from {url} the services: {services}")
-
-    # Instantiate & serialize the OidInterpreter
-    return SCOPE_INTERPRETERS.setdefault(uri, OidInterpreter(services))
+    # Concurrent callers share the same interpreter (and catalog watcher)
+    with SCOPE_INTERPRETERS_LOCK:
+        if uri not in SCOPE_INTERPRETERS:
+            version = get_catalog_version(url)
+            catalog = load_catalog(url)
+            interpreter = OidInterpreter.from_catalog(
+                catalog, wire_format=wire_format)
+            if reload_interval > 0:
+                interpreter.watcher = CatalogWatcher(
+                    url, interpreter.update_catalog, reload_interval, version)
+                interpreter.watcher.start()
+
+            # Serialize the OidInterpreter
+            SCOPE_INTERPRETERS[uri] = interpreter
+
+    return SCOPE_INTERPRETERS[uri]
 
 
 def get_interpreter_from_services(
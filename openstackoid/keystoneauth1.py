@@ -12,6 +12,7 @@ from requests import Session
 import logging
 
 from .configuration import SERVICES_CATALOG_PATH
+from .health import get_health_registry
 from .interpreter import get_interpreter
 from .http.send import send_scope
 
@@ -21,4 +22,5 @@ logger = logging.getLogger(__name__)
 
 interpreter = get_interpreter(SERVICES_CATALOG_PATH)
 logger.warning("Monkey patching 'Session.send'")
-Session.send = send_scope(interpreter)(Session.send)
+Session.send = send_scope(interpreter,
+                          health=get_health_registry())(Session.send)
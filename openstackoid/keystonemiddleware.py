@@ -50,13 +50,148 @@ BaseAuthProtocol middleware to target the good Keystone based on the scope.
 
 
 import copy
+import datetime
 import functools
+import hashlib
+import json
+
+import iso8601
 
 from keystoneauth1.adapter import Adapter
 from keystoneauth1.identity import v3
 from keystoneauth1.session import Session
 from keystonemiddleware.auth_token import _identity
 
+from .configuration import (KEYSTONE_CLIENTS_SIZE, KEYSTONE_CLIENTS_TTL,
+                            TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+from .utils import LRUCache
+
+
+# Pool of admin keystone clients as triplets (Auth, Session, _identity.Server)
+# keyed by (cloud_auth_url, cloud_name, os_scope), since a session sends the
+# X-Scope it has been created with. Reusing a client reuses its token (as long
+# as it is valid) and the connections of its session.
+K_CLIENTS = LRUCache(maxsize=KEYSTONE_CLIENTS_SIZE, ttl=KEYSTONE_CLIENTS_TTL)
+
+
+class MemoryTokenBackend:
+    """In-process backend of a `TokenCache`.
+
+    Implements the subset of the memcached client interface used by the
+    `TokenCache` (i.e., `get(key)` and `set(key, value, time=0)`), so that a
+    memcached client (e.g., `memcache.Client`) can be used instead to share
+    validated tokens between processes.
+
+    """
+
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, time=0):
+        self._cache.set(key, value, ttl=time if time else None)
+        return True
+
+
+class TokenCache:
+    """Cache of the tokens validated by the keystone of a cloud.
+
+    Validated token data are stored (serialized in JSON) in a memcached-like
+    `backend` under a key made of the identity cloud and a hash of the token,
+    until the expiry of the token or at most `max_ttl` seconds.
+
+    """
+
+    def __init__(self, backend=None, max_ttl=TOKEN_CACHE_TTL):
+        self.backend = backend if backend is not None else MemoryTokenBackend()
+        self.max_ttl = max_ttl
+
+    @staticmethod
+    def make_key(cloud_name, token):
+        digest = hashlib.sha256(f"{cloud_name}\n{token}".encode('utf-8'))
+        return "openstackoid/token/%s" % digest.hexdigest()
+
+    @staticmethod
+    def get_expiry(data):
+        """Get the expiry date of validated token `data`, if any.
+
+        Args:
+            data (dict): Token data as returned by `verify_token`, either v3
+                (`{'token': {'expires_at': ...}}`) or v2
+                (`{'access': {'token': {'expires': ...}}}`).
+
+        Returns:
+            A timezone aware `datetime.datetime` or None.
+
+        """
+        try:
+            if 'token' in data:
+                expires = data['token']['expires_at']
+            else:
+                expires = data['access']['token']['expires']
+            return iso8601.parse_date(expires)
+        except (KeyError, TypeError, iso8601.ParseError):
+            return None
+
+    def get(self, cloud_name, token):
+        value = self.backend.get(self.make_key(cloud_name, token))
+        return json.loads(value) if value else None
+
+    def set(self, cloud_name, token, data):
+        """Cache the validated `data` of `token` until its expiry.
+
+        Tokens without expiry, or already expired, are not cached.
+
+        """
+        expires = self.get_expiry(data)
+        if not expires:
+            return
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        ttl = min((expires - now).total_seconds(), self.max_ttl)
+        if ttl >= 1:
+            self.backend.set(self.make_key(cloud_name, token),
+                             json.dumps(data), time=int(ttl))
+
+
+# Tokens validated by the keystone of any cloud. Set `TOKEN_CACHE.backend` to
+# a memcached client to share the validations between processes.
+TOKEN_CACHE = TokenCache()
+
+
+class CachedIdentityServer:
+    """Keystone client validating tokens through the `TOKEN_CACHE`.
+
+    Wraps an `_identity.IdentityServer` of the cloud `cloud_name`, so that
+    repeated validations of the same token skip the round-trip to the (remote)
+    keystone. Other methods are delegated to the wrapped client.
+
+    """
+
+    def __init__(self, k_client, cloud_name, token_cache=TOKEN_CACHE):
+        self._k_client = k_client
+        self._cloud_name = cloud_name
+        self._token_cache = token_cache
+
+    def __getattr__(self, name):
+        return getattr(self._k_client, name)
+
+    def verify_token(self, user_token, retry=True, allow_expired=False):
+        # Validation of expired tokens (e.g., for service tokens) is never
+        # cached
+        if allow_expired:
+            return self._k_client.verify_token(user_token, retry=retry,
+                                               allow_expired=allow_expired)
+
+        data = self._token_cache.get(self._cloud_name, user_token)
+        if data is None:
+            data = self._k_client.verify_token(user_token, retry=retry)
+            self._token_cache.set(self._cloud_name, user_token, data)
+
+        return data
+
 
 def make_admin_auth(cloud_auth_url, log):
     """Build a new Authentication plugin for admin (Password based).
@@ -126,8 +261,11 @@ def make_keystone_client(cloud_name, session, os_scope, log):
 def get_admin_keystone_client(cloud_auth_url, cloud_name, os_scope, log):
     """Get or Lazily create a keystone client on `cloud_auth_url`.
 
-    Lookup into `K_CLIENTS` for a keystone client on `cloud_auth_url`.
-    Creates an admin client if misses and returns it.
+    Lookup into `K_CLIENTS` for a keystone client on `cloud_auth_url` that
+    sends `os_scope`. Creates an admin client if misses and returns it.
+    Clients are evicted when least recently used or after
+    `KEYSTONE_CLIENTS_TTL` seconds, see `K_CLIENTS.stats` for hits, misses
+    and evictions.
 
     Args:
         cloud_auth_url (str): Identity service endpoint for authentication,
@@ -136,6 +274,9 @@ def get_admin_keystone_client(cloud_auth_url, cloud_name, os_scope, log):
         cloud_name (str): Name of the Cloud as in services.json (e.g,
             CloudOne, CloudTwo, ...).
 
+        os_scope (str): Scope sent to keystone by the client, with every
+            request of its session.
+
         log (logging.Logger): Logger for debug information.
 
     Returns:
@@ -143,11 +284,54 @@ def get_admin_keystone_client(cloud_auth_url, cloud_name, os_scope, log):
 
     """
 
-    auth = make_admin_auth(cloud_auth_url, log)
-    sess = Session(auth=auth, additional_headers={"X-Scope": os_scope})
-    k_client = make_keystone_client(cloud_name, sess, os_scope, log)
-    log.info(f"Lazy client created for key '{cloud_auth_url}'")
-    return (auth, sess, k_client)
+    def create_client():
+        auth = make_admin_auth(cloud_auth_url, log)
+        sess = Session(auth=auth, additional_headers={"X-Scope": os_scope})
+        k_client = make_keystone_client(cloud_name, sess, os_scope, log)
+        log.info(f"Lazy client created for key '{cloud_auth_url}'")
+        return (auth, sess, k_client)
+
+    return K_CLIENTS.get_or_create((cloud_auth_url, cloud_name, os_scope),
+                                   create_client)
+
+
+def make_middleware_view(cls, cloud_auth_url, cloud_name, os_scope):
+    """Build a copy of a BaseAuthProtocol middleware targeting a keystone.
+
+    The copy shares the state of `cls` (e.g., its caches) but its keystone
+    client targets `cloud_auth_url`, so `cls` is never changed (thread safety).
+
+    Args:
+        cls (BaseAuthProtocol): Reference to a BaseAuthProtocol middleware.
+
+        cloud_auth_url (str): Identity service endpoint for authentication.
+
+        cloud_name (str): Name of the Cloud as in services.json.
+
+        os_scope (str): Scope sent to keystone by the keystone client.
+
+    Returns:
+        A copy of `cls`.
+
+    """
+    cls.log.warning("Openstackoid decorating keystonemiddleware")
+    kls = copy.copy(cls)
+
+    # Get the proper Keystone client and unpdate `kls` middleware in
+    # regards.
+    #
+    # In this PoC, we know that every OpenStack cloud is Devstack based.
+    # Hence, we can rely on admin user to connect to Keystone of another
+    # cloud (i.e., `cloud_auth_url`)..
+    (auth, sess, k_client) = get_admin_keystone_client(
+        cloud_auth_url, cloud_name, os_scope, kls.log)
+
+    kls._auth = auth
+    kls._session = sess
+    kls._identity_server = CachedIdentityServer(k_client, cloud_name)
+    kls._www_authenticate_uri = cloud_auth_url
+    kls._include_service_catalog = True
+    return kls
 
 
 def target_good_keystone(f):
@@ -166,35 +350,29 @@ def target_good_keystone(f):
         cls (BaseAuthProtocol): Reference to a BaseAuthProtocol middleware.
 
         """
-        # Make a copy of the middleware cloud every-time someone process a
-        # request for thread safety (since we change its state).
-        cls.log.warning("Openstackoid decorating keystonemiddleware")
-        kls = copy.copy(cls)
-
         # `original_auth_url` is the default keystone URL (as in the
         # configuration file) and `cloud_auth_url` is the keystone URL of
         # the targeted cloud.
-        original_auth_url = kls._conf.get('auth_url')
+        original_auth_url = cls._conf.get('auth_url')
         request_headers = request.headers
         cloud_auth_url = request_headers.get('X-Identity-Url',
                                              original_auth_url)
         cloud_name = request_headers.get('X-Identity-Cloud')
         os_scope = request_headers.get('X-Scope')
 
-        # Get the proper Keystone client and unpdate `kls` middleware in
-        # regards.
-        #
-        # In this PoC, we know that every OpenStack cloud is Devstack based.
-        # Hence, we can rely on admin user to connect to Keystone of another
-        # cloud (i.e., `cloud_auth_url`)..
-        (auth, sess, k_client) = get_admin_keystone_client(
-            cloud_auth_url, cloud_name, os_scope, kls.log)
-
-        kls._auth = auth
-        kls._session = sess
-        kls._identity_server = k_client
-        kls._www_authenticate_uri = cloud_auth_url
-        kls._include_service_catalog = True
+        # Views of the middleware (i.e., copies targeting the keystone of a
+        # cloud) are built once per cloud and scope, and then reused by every
+        # request. They expire with their keystone client.
+        views = cls.__dict__.get('_oid_views')
+        if views is None:
+            views = cls.__dict__.setdefault(
+                '_oid_views', LRUCache(maxsize=KEYSTONE_CLIENTS_SIZE,
+                                       ttl=KEYSTONE_CLIENTS_TTL))
+
+        kls = views.get_or_create(
+            (cloud_auth_url, cloud_name, os_scope),
+            lambda: make_middleware_view(cls, cloud_auth_url, cloud_name,
+                                         os_scope))
 
         return f(kls, request)
     return wrapper
@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -
+#   ____                ______           __        _    __
+#  / __ \___  ___ ___  / __/ /____ _____/ /_____  (_)__/ /
+# / /_/ / _ \/ -_) _ \_\ \/ __/ _ `/ __/  '_/ _ \/ / _  /
+# \____/ .__/\__/_//_/___/\__/\_,_/\__/_/\_\\___/_/\_,_/
+#     /_/
+# Make your OpenStacks Collaborative
+
+
+from collections import deque
+from typing import Deque, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from urllib import parse
+
+from requests import Request
+from requests.structures import CaseInsensitiveDict
+
+import argparse
+import asyncio
+import logging
+
+from .configuration import (PROXY_BUFFER_SIZE, PROXY_POOL_SIZE,
+                            SERVICES_CATALOG_PATH)
+from .interpreter import OidInterpreter, get_interpreter
+
+
+logger = logging.getLogger(__name__)
+
+
+# Headers that only apply to a single connection, and thus are not forwarded.
+# The framing of bodies (Transfer-Encoding, Content-Length) is relayed as is.
+HOP_BY_HOP_HEADERS = frozenset(["connection", "keep-alive", "proxy-connection",
+                                "proxy-authenticate", "proxy-authorization",
+                                "te", "trailer", "upgrade"])
+
+
+# Methods of the requests replayed on a new connection when a pooled one
+# fails, since the backend may have processed the request before failing.
+REPLAYABLE_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "TRACE"])
+
+
+Headers = List[Tuple[str, str]]
+
+
+class Origin(NamedTuple):
+    host: str
+    port: int
+    ssl: bool
+
+    @classmethod
+    def from_url(cls, url: str) -> 'Origin':
+        uri = parse.urlsplit(url)
+        ssl = uri.scheme == "https"
+        return cls(uri.hostname, uri.port or (443 if ssl else 80), ssl)
+
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class ConnectionPool:
+    """Pool of keep-alive connections to backends.
+
+    At most `maxsize` idle connections are kept per `Origin`. A connection
+    closed by the backend while idle is dropped on the next `acquire`.
+
+    """
+
+    def __init__(self, maxsize: int = PROXY_POOL_SIZE):
+        self.maxsize = maxsize
+        self._idle: Dict[Origin, Deque[Connection]] = {}
+
+    async def acquire(self, origin: Origin) -> Tuple[Connection, bool]:
+        """Get a connection to `origin`.
+
+        Returns the connection and whether it has been reused from the pool.
+
+        """
+
+        idle = self._idle.get(origin)
+        while idle:
+            reader, writer = idle.pop()
+            if not (reader.at_eof() or writer.is_closing()):
+                return (reader, writer), True
+
+            writer.close()
+
+        connection = await asyncio.open_connection(origin.host, origin.port,
+                                                   ssl=origin.ssl or None,
+                                                   limit=PROXY_BUFFER_SIZE)
+        return connection, False
+
+    def release(self, origin: Origin, connection: Connection,
+                reusable: bool = True) -> None:
+        idle = self._idle.setdefault(origin, deque())
+        if reusable and len(idle) < self.maxsize:
+            idle.append(connection)
+        else:
+            connection[1].close()
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            while idle:
+                idle.pop()[1].close()
+
+
+class ProxyError(Exception):
+    """Error answered to the client with an HTTP `status`."""
+
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+def _get(headers: Headers, name: str) -> Optional[str]:
+    return next((v for k, v in headers if k.lower() == name), None)
+
+
+def _keep_alive(version: str, headers: Headers) -> bool:
+    tokens = (_get(headers, "connection") or "").lower()
+    if version == "HTTP/1.0":
+        return "keep-alive" in tokens
+
+    return "close" not in tokens
+
+
+def _end_to_end(headers: Headers) -> Headers:
+    """Remove the hop-by-hop headers from `headers`."""
+
+    listed = {t.strip().lower()
+              for t in (_get(headers, "connection") or "").split(",")}
+    return [(k, v) for k, v in headers
+            if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() not in listed]
+
+
+async def _read_head(reader: asyncio.StreamReader
+                     ) -> Optional[Tuple[List[str], Headers]]:
+    """Read the start line and headers of an HTTP message.
+
+    Returns `None` if the connection is closed before a new message.
+
+    """
+
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise ProxyError(400, "Bad Request", "Truncated message head")
+    except asyncio.LimitOverrunError:
+        raise ProxyError(431, "Request Header Fields Too Large",
+                         "Message head too large")
+
+    lines = head.decode("latin-1").split("\r\n")[:-2]
+    start_line = lines[0].split(" ", 2)
+    headers = []
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if not sep or not name or name != name.strip():
+            raise ProxyError(400, "Bad Request", f"Invalid header: {line}")
+        headers.append((name, value.strip()))
+
+    return start_line, headers
+
+
+def _write_head(writer: asyncio.StreamWriter, start_line: str,
+                headers: Headers) -> None:
+    lines = [start_line] + [f"{k}: {v}" for k, v in headers] + ["", ""]
+    writer.write("\r\n".join(lines).encode("latin-1"))
+
+
+def _get_framing(headers: Headers) -> Optional[str]:
+    """Get the framing of a message body: "chunked", a length or `None`."""
+
+    encoding = _get(headers, "transfer-encoding")
+    if encoding:
+        if encoding.lower().split(",")[-1].strip() != "chunked":
+            return None
+        return "chunked"
+
+    length = _get(headers, "content-length")
+    if length is not None:
+        if not length.isdigit():
+            raise ProxyError(400, "Bad Request", "Invalid Content-Length")
+        return length
+
+    return None
+
+
+async def _relay_body(reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter,
+                      framing: Optional[str]) -> None:
+    """Stream a body framed with `framing` (see `_get_framing`).
+
+    With a `None` framing, the body is streamed until the end of `reader`.
+
+    """
+
+    if framing == "chunked":
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            writer.write(size_line)
+            try:
+                size = int(size_line.split(b";", 1)[0], 16)
+            except ValueError:
+                raise ConnectionError(f"Invalid chunk size: {size_line!r}")
+            if size == 0:
+                # Trailer fields, up to the final empty line
+                line = size_line
+                while line != b"\r\n":
+                    line = await reader.readuntil(b"\r\n")
+                    writer.write(line)
+                break
+
+            while size:
+                data = await reader.read(min(size, PROXY_BUFFER_SIZE))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", size)
+                writer.write(data)
+                size -= len(data)
+                await writer.drain()
+            writer.write(await reader.readexactly(2))
+    elif framing is not None:
+        remaining = int(framing)
+        while remaining:
+            data = await reader.read(min(remaining, PROXY_BUFFER_SIZE))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            writer.write(data)
+            remaining -= len(data)
+            await writer.drain()
+    else:
+        while True:
+            data = await reader.read(PROXY_BUFFER_SIZE)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+
+    await writer.drain()
+
+
+class OidProxy:
+    """Reverse proxy routing requests with an `OidInterpreter`.
+
+    The proxy stands in front of the services of a cloud, in place of HAProxy
+    and its `interpret_scope` Lua script. It interprets the scope of each
+    request with `OidInterpreter.interpret` and forwards the updated request
+    to the targeted cloud. Bodies are streamed, and connections to backends
+    are kept alive in a `ConnectionPool`.
+
+    The `backends` maps the base URL of a service in the catalog (i.e., the
+    frontend, e.g., `http://192.168.141.245:8888`) to the address the proxy
+    actually connects to (e.g., the local backend `http://10.0.2.15:80`).
+    Other URLs are reached directly. The URL of a request is rebuilt from its
+    Host header and the `scheme`.
+
+    """
+
+    def __init__(self, interpreter: OidInterpreter,
+                 backends: Optional[Mapping[str, str]] = None,
+                 scheme: str = "http",
+                 pool: Optional[ConnectionPool] = None):
+        self.interpreter = interpreter
+        self.backends = {k.rstrip("/"): Origin.from_url(v)
+                         for k, v in (backends or {}).items()}
+        self.scheme = scheme
+        self.pool = pool if pool is not None else ConnectionPool()
+
+    def route(self, method: str, target: str,
+              headers: Headers) -> Tuple[str, Origin, Headers]:
+        """Interpret the scope of a request.
+
+        Returns the path of the interpreted request, the `Origin` to forward
+        it to and its headers.
+
+        """
+
+        if target.startswith("/"):
+            host = _get(headers, "host")
+            if not host:
+                raise ProxyError(400, "Bad Request", "Missing Host header")
+            url = f"{self.scheme}://{host}{target}"
+        else:
+            url = target
+
+        request = Request(method, url, headers=CaseInsensitiveDict(headers))
+        try:
+            self.interpreter.interpret(request)
+        except (KeyError, StopIteration, TypeError, ValueError) as e:
+            raise ProxyError(400, "Bad Request",
+                             f"Cannot interpret the scope of {url}: {e!r}")
+
+        uri = parse.urlsplit(request.url)
+        base = f"{uri.scheme}://{uri.netloc}"
+        origin = self.backends.get(base) or Origin.from_url(base)
+        path = parse.urlunsplit(("", "", uri.path or "/", uri.query, ""))
+        headers = [(k, v) for k, v in request.headers.items()
+                   if k.lower() != "host"]
+        headers.insert(0, ("Host", uri.netloc))
+        logger.debug(f"Route {method} {url} to {origin} as {request.url}")
+        return path, origin, headers
+
+    async def forward(self, client_reader: asyncio.StreamReader,
+                      client_writer: asyncio.StreamWriter,
+                      start_line: List[str], headers: Headers) -> bool:
+        """Forward a request to its backend and stream back the response.
+
+        Returns whether the client connection may be kept alive.
+
+        """
+
+        if len(start_line) != 3 or not start_line[2].startswith("HTTP/1."):
+            raise ProxyError(400, "Bad Request", "Invalid request line")
+
+        method, target, version = start_line
+        keep_alive = _keep_alive(version, headers)
+        request_framing = _get_framing(headers)
+        if request_framing is None:
+            if _get(headers, "transfer-encoding"):
+                raise ProxyError(501, "Not Implemented",
+                                 "Unsupported Transfer-Encoding")
+            request_framing = "0"
+        path, origin, request_headers = self.route(
+            method, target, _end_to_end(headers))
+
+        # A connection from the pool may have been closed by the backend in
+        # the meantime: retry on a new connection if the body has not been
+        # consumed yet, and if the request is safe to replay
+        while True:
+            try:
+                connection, reused = await self.pool.acquire(origin)
+            except OSError as e:
+                raise ProxyError(502, "Bad Gateway",
+                                 f"Cannot connect to {origin}: {e}")
+
+            reader, writer = connection
+            try:
+                _write_head(writer, f"{method} {path} HTTP/1.1",
+                            request_headers)
+                await _relay_body(client_reader, writer, request_framing)
+                response = await _read_head(reader)
+                while response and response[0][1].startswith("1") \
+                        and response[0][1] != "101":
+                    # Interim response (e.g., 100 Continue)
+                    _write_head(client_writer, " ".join(response[0]),
+                                response[1])
+                    response = await _read_head(reader)
+                if response is None:
+                    raise ConnectionResetError("Connection closed by backend")
+                break
+            except (OSError, asyncio.IncompleteReadError, ProxyError) as e:
+                writer.close()
+                if reused and request_framing == "0" \
+                   and method in REPLAYABLE_METHODS:
+                    continue
+                raise ProxyError(502, "Bad Gateway",
+                                 f"Error with backend {origin}: {e}")
+
+        status_line, response_headers = response
+        if method == "HEAD" or status_line[1] in ("204", "304"):
+            response_framing = "0"
+        else:
+            response_framing = _get_framing(response_headers)
+
+        reusable = (response_framing is not None
+                    and status_line[0] == "HTTP/1.1"
+                    and _keep_alive(status_line[0], response_headers))
+        keep_alive = keep_alive and response_framing is not None
+        response_headers = _end_to_end(response_headers)
+        if not keep_alive:
+            response_headers.append(("Connection", "close"))
+
+        try:
+            _write_head(client_writer, " ".join(status_line),
+                        response_headers)
+            if method != "HEAD":
+                await _relay_body(reader, client_writer, response_framing)
+        except BaseException:
+            writer.close()
+            raise
+
+        self.pool.release(origin, connection, reusable)
+        return keep_alive
+
+    async def handle(self, client_reader: asyncio.StreamReader,
+                     client_writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of a client connection."""
+
+        try:
+            keep_alive = True
+            while keep_alive:
+                message = await _read_head(client_reader)
+                if message is None:
+                    break
+                keep_alive = await self.forward(client_reader, client_writer,
+                                                *message)
+        except ProxyError as e:
+            logger.warning(f"{e.status} {e.reason}: {e}")
+            body = f"{e}\n".encode()
+            _write_head(client_writer, f"HTTP/1.1 {e.status} {e.reason}",
+                        [("Content-Type", "text/plain"),
+                         ("Content-Length", str(len(body))),
+                         ("Connection", "close")])
+            client_writer.write(body)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"Connection with the client aborted: {e}")
+        finally:
+            client_writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port,
+                                          limit=PROXY_BUFFER_SIZE)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Route OpenStack API requests according to their scope.
+
+    E.g., on the frontend of CloudOne, with its services behind 10.0.2.15:
+
+    > python -m openstackoid.proxy --bind 192.168.141.245 --port 8888 \
+      --backend http://192.168.141.245:8888=http://10.0.2.15:80
+
+    """
+
+    parser = argparse.ArgumentParser(description=main.__doc__.split("\n")[0])
+    parser.add_argument("--catalog", default=SERVICES_CATALOG_PATH,
+                        help="url of the services catalog")
+    parser.add_argument("--bind", default="127.0.0.1",
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=8888,
+                        help="port to listen on")
+    parser.add_argument("--backend", action="append", default=[],
+                        metavar="FRONTEND=BACKEND",
+                        help="connect to BACKEND for services of FRONTEND, "
+                        "e.g., http://192.168.141.245:8888=http://10.0.2.15")
+    options = parser.parse_args(argv)
+
+    backends = dict(b.split("=", 1) for b in options.backend)
+    proxy = OidProxy(get_interpreter(options.catalog), backends)
+
+    loop = asyncio.get_event_loop()
+    server = loop.run_until_complete(proxy.serve(options.bind, options.port))
+    logger.info(f"Proxy listening on {options.bind}:{options.port}")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        proxy.pool.close()
+        loop.run_until_complete(server.wait_closed())
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ Adds `--oid-scope` global parameter:
   "image": "OS_SCOPE_IMAGE | OS_REGION_NAME",
   "network": "OS_SCOPE_NETWORK | OS_REGION_NAME",
   "placement": "OS_SCOPE_PLACEMENT | OS_REGION_NAME",
+  "volumev3": "OS_SCOPE_VOLUMEV3 | OS_REGION_NAME",
 }' (Env: OS_SCOPE)
 """
 
@@ -78,7 +79,8 @@ def build_option_parser(parser):
                   "identity": _fmt_doc('identity'),
                   "image": _fmt_doc('image'),
                   "network": _fmt_doc('network'),
-                  "placement": _fmt_doc('placement')})))
+                  "placement": _fmt_doc('placement'),
+                  "volumev3": _fmt_doc('volumev3')})))
     return parser
 
 
@@ -7,12 +7,15 @@
 # Make your OpenStacks Collaborative
 
 
+from collections import OrderedDict
 from os import environ
-from typing import Any, Callable, Dict, Optional, Tuple, Type
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
 
 import functools
 import inspect
 import logging
+import threading
+import time
 
 
 logger = logging.getLogger(__name__)
@@ -33,10 +36,114 @@ def get_default_scope() -> Dict[str, str]:
         "identity": _get_os_scope_service_env("identity"),
         "image": _get_os_scope_service_env("image"),
         "network": _get_os_scope_service_env("network"),
-        "placement": _get_os_scope_service_env("placement")
+        "placement": _get_os_scope_service_env("placement"),
+        "volumev3": _get_os_scope_service_env("volumev3")
     }
 
 
+class LRUCache:
+    """Thread-safe and bounded cache with a least-recently-used eviction.
+
+    Entries may also expire after a time-to-live (in seconds), either set for
+    the whole cache (`ttl`) or per entry. The cache counts its hits, misses and
+    evictions (of least-recently-used or expired entries), see `stats`.
+
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        # Must be called with the lock held
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the value of `key`, or `default` if missing or expired."""
+
+        with self._lock:
+            found, value = self._lookup(key)
+            return value if found else default
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[float] = None) -> None:
+        """Set the `value` of `key`, with an optional specific `ttl`."""
+
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Get the value of `key`, or create it with `factory` on a miss.
+
+        The `factory` is called outside of the lock, so a slow creation does not
+        block the other keys. If two threads miss the same key at the same time,
+        the first created value wins.
+
+        """
+
+        with self._lock:
+            found, value = self._lookup(key)
+        if found:
+            return value
+
+        value = factory()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or
+                                      entry[1] > time.monotonic()):
+                return entry[0]
+
+        self.set(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove `key` and return its value, or `default` if missing."""
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry is not None else default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions}
+
+
 def update_tuple(old: Any, new: Any, arguments: Tuple) -> Tuple:
     """Update a value of a tuple with an new value.
 
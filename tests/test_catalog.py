@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from openstackoid.catalog import (CatalogWatcher, Service, load_catalog,
+                                  load_services, main)
+from openstackoid.interpreter import OidInterpreter, get_interpreter
+
+
+ENDPOINTS = [
+    {"Service Type": "image", "Interface": "public",
+     "URL": "http://one/image", "Region": "CloudOne"},
+    {"Service Type": "image", "Interface": "public",
+     "URL": "http://two/image", "Region": "CloudTwo"}
+]
+
+
+NEW_ENDPOINT = {"Service Type": "image", "Interface": "public",
+                "URL": "http://three/image", "Region": "CloudThree"}
+
+
+def _write_catalog(tmp_path, endpoints):
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(json.dumps(endpoints))
+    return f"file://{catalog_path}"
+
+
+def test_load_services(tmp_path):
+    url = _write_catalog(tmp_path, ENDPOINTS)
+    assert load_services(url)[1] == Service(service_type="image",
+                                            cloud="CloudTwo",
+                                            url="http://two/image",
+                                            interface="public")
+
+
+def test_catalog_reload(tmp_path):
+    url = _write_catalog(tmp_path, ENDPOINTS)
+    interpreter = get_interpreter(url, reload_interval=0)
+    assert interpreter.watcher is None
+    assert get_interpreter(url) is interpreter
+
+    watcher = CatalogWatcher(url, interpreter.update_catalog, interval=0)
+    assert watcher.check()
+    assert not watcher.check()
+
+    _write_catalog(tmp_path, ENDPOINTS + [NEW_ENDPOINT])
+    assert watcher.check()
+    assert interpreter.catalog.find("image", "public", "CloudThree")
+
+    # an invalid catalog is ignored
+    (tmp_path / "catalog.json").write_text("{")
+    assert not watcher.check()
+    assert len(interpreter.services) == 3
+
+
+def test_get_interpreter_concurrent(tmp_path):
+    url = _write_catalog(tmp_path, ENDPOINTS)
+    barrier = threading.Barrier(4, timeout=5)
+
+    def get():
+        barrier.wait()
+        return get_interpreter(url, reload_interval=60)
+
+    with ThreadPoolExecutor(4) as executor:
+        interpreters = list(executor.map(lambda _: get(), range(4)))
+
+    # a single interpreter, thus a single watcher, is created
+    assert all(i is interpreters[0] for i in interpreters)
+    watchers = [t for t in threading.enumerate()
+                if t.name == "oid-catalog-watcher"]
+    assert watchers == [interpreters[0].watcher]
+    interpreters[0].watcher.stop()
+
+
+def test_catalog_formats(tmp_path):
+    url = _write_catalog(tmp_path, ENDPOINTS)
+    services = load_services(url)
+    main([url, f"sqlite://{tmp_path / 'catalog.db'}"])
+    main([url, f"snapshot://{tmp_path / 'catalog.snapshot'}"])
+
+    for scheme, name in [("sqlite", "catalog.db"),
+                         ("snapshot", "catalog.snapshot")]:
+        catalog_url = f"{scheme}://{tmp_path / name}"
+        assert load_services(catalog_url) == services
+
+        catalog = load_catalog(catalog_url)
+        assert len(catalog) == 2
+        assert catalog.find("image", "public", "CloudTwo") == services[1]
+        assert catalog.find("image", "admin", "CloudTwo") is None
+        assert catalog.find_by_url("http://two/image/v2") == services[1]
+        assert catalog.find_by_url("http://two") is None
+
+
+def test_sqlite_catalog_close(tmp_path):
+    url = _write_catalog(tmp_path, ENDPOINTS)
+    main([url, f"sqlite://{tmp_path / 'catalog.db'}"])
+    catalog_url = f"sqlite://{tmp_path / 'catalog.db'}"
+    catalog = load_catalog(catalog_url)
+    interpreter = OidInterpreter.from_catalog(catalog)
+    connection = catalog._connection
+
+    # the connection of the replaced catalog is released on swap
+    interpreter.update_catalog(load_catalog(catalog_url))
+    assert catalog._connection is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+
+    # a lookup still holding the replaced catalog reopens it
+    assert catalog.find("image", "public", "CloudTwo") is not None
+    catalog.close()
+
+
+def test_catalog_misses(tmp_path, monkeypatch):
+    catalog = load_catalog(_write_catalog(tmp_path, ENDPOINTS))
+    probes = []
+    find_by_url = catalog._find_by_url
+    monkeypatch.setattr(catalog, "_find_by_url",
+                        lambda url: probes.append(url) or find_by_url(url))
+
+    assert catalog.find_by_url("http://keystone/v3") is None
+    assert catalog.find_by_url("http://keystone/v2.0") is None
+    assert catalog.find_by_url("http://two/image/v2") is not None
+
+    # both misses share their first 16 characters, the longest service URL
+    assert catalog.misses.stats["size"] == 1
+    assert catalog.misses.hits == 1
+    # a cached miss does not probe the indexes
+    assert probes == ["http://keystone/v3", "http://two/image/v2"]
+    for _ in range(3):
+        assert catalog.find_by_url("http://keystone/v3") is None
+    assert len(probes) == 2
+    assert catalog.misses.hits == 4
+
+
+def test_snapshot_error(tmp_path):
+    snapshot_path = tmp_path / "catalog.snapshot"
+    snapshot_path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        load_services(f"snapshot://{snapshot_path}")
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from openstackoid.catalog import Service, ServiceCatalog
+from openstackoid.http.codec import (decode_scope, encode_scope,
+                                     get_scope_codec, register_scope_codec,
+                                     unregister_scope_codec,
+                                     use_compact_scope)
+
+
+SCOPE = {"identity": "CloudOne", "image": "CloudTwo"}
+
+
+def test_decode_scope_cache():
+    decode_scope.cache_clear()
+    scope = decode_scope(json.dumps(SCOPE))
+    assert scope == SCOPE
+    assert decode_scope(json.dumps(SCOPE)) is scope
+
+    info = decode_scope.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+    # cached scopes are shared, hence read-only
+    with pytest.raises(TypeError):
+        scope["image"] = "CloudOne"
+
+
+def test_encode_scope():
+    encode_scope.cache_clear()
+    assert json.loads(encode_scope(SCOPE)) == SCOPE
+    assert encode_scope(decode_scope(encode_scope(SCOPE))) \
+        == encode_scope(SCOPE)
+    assert encode_scope.cache_info().hits == 3
+
+    # unhashable values are serialized but not cached
+    assert json.loads(encode_scope({"image": ["CloudTwo"]})) \
+        == {"image": ["CloudTwo"]}
+
+
+def test_compact_scope():
+    services = [Service("identity", "CloudOne", "http://one/id", "admin"),
+                Service("image", "CloudOne", "http://one/image", "public"),
+                Service("image", "CloudTwo", "http://two/image", "public")]
+    catalog = ServiceCatalog(services)
+    register_scope_codec(catalog)
+    codec = get_scope_codec(catalog)
+    scope = {"identity": "CloudOne",
+             "image": "(CloudOne | CloudTwo) & CloudTwo"}
+    value = codec.encode(scope.items())
+    assert value == f"~1:{codec.digest}:0.0,1.(0|1)&1"
+    assert decode_scope(value) == scope
+
+    # json is still the default, and the fallback for unknown clouds
+    assert encode_scope(scope).startswith("{")
+    assert encode_scope(scope, codec) == value
+    assert encode_scope({"image": "CloudThree"}, codec) \
+        == '{"image": "CloudThree"}'
+    use_compact_scope(codec)
+    try:
+        assert encode_scope(scope) == value
+    finally:
+        use_compact_scope(None)
+
+    # scopes of an unregistered catalog are not understood anymore
+    unregister_scope_codec(catalog)
+    decode_scope.cache_clear()
+    with pytest.raises(ValueError):
+        decode_scope(value)
+
+    with pytest.raises(ValueError):
+        decode_scope("~1:00000000:0.0")
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from openstackoid import configuration
@@ -60,5 +62,22 @@ def test_push_execution_scope_twice():
 
 def test___local_context():
     assert configuration._get_from_context('service_scope') is None
-    assert vars(configuration.__local_context) == \
-        {'shell_scope': SCOPE, 'atomic_scope': 'CloudTwo'}
+    assert configuration._get_from_context('shell_scope') == SCOPE
+
+
+def test_execution_scope_isolation():
+    execution_scope = ("image", "CloudOne")
+    configuration.push_execution_scope(execution_scope)
+
+    def worker():
+        # the scope is propagated, but the pushes of the worker stay local
+        assert configuration.get_shell_scope() == SCOPE
+        assert configuration.get_execution_scope() == execution_scope
+        configuration.push_execution_scope(("image", "CloudTwo"))
+        return configuration.get_execution_scope()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = configuration.submit_in_context(executor, worker)
+        assert future.result() == ("image", "CloudTwo")
+
+    assert configuration.pop_execution_scope() == execution_scope
@@ -0,0 +1,256 @@
+import asyncio
+import threading
+
+import pytest
+
+from concurrent.futures import Future, TimeoutError
+
+from openstackoid import dispatcher
+from openstackoid.configuration import get_execution_scope
+from openstackoid.health import CircuitOpenError, HealthRegistry
+
+
+SERVICE_TYPE = "compute"
+
+
+def _scoped(expression, **keywords):
+    """Build a scoped function recording the endpoints it is executed on."""
+
+    calls = []
+
+    @dispatcher.scope(None,
+                      extr_scp_func=lambda _, *a, **k: (SERVICE_TYPE,
+                                                        expression),
+                      **keywords)
+    def func(value):
+        endpoint = get_execution_scope()[1]
+        calls.append(endpoint)
+        return value(endpoint) if callable(value) else value
+
+    return func, calls
+
+
+def _concat_conj_res_func(this, other):
+    other.result = this.result + other.result
+    return other
+
+
+def test_scope_simple():
+    func, calls = _scoped("CloudOne")
+    assert func(42) == 42
+    assert calls == ["CloudOne"]
+
+
+def test_scope_conjunction():
+    func, calls = _scoped("CloudOne & CloudTwo")
+    assert func(lambda endpoint: endpoint) == "CloudTwo"
+    assert calls == ["CloudOne", "CloudTwo"]
+
+
+def test_scope_disjunction():
+    func, calls = _scoped("CloudOne | CloudTwo")
+    assert func(lambda endpoint: endpoint) == "CloudOne"
+    assert calls == ["CloudOne"]
+
+    func, calls = _scoped("CloudOne | CloudTwo")
+    assert func(lambda endpoint: endpoint == "CloudTwo") is True
+    assert calls == ["CloudOne", "CloudTwo"]
+
+
+def test_scope_falsy_result():
+    # a falsy result is kept, the leaves are not executed again
+    func, calls = _scoped("CloudOne | CloudTwo")
+    assert func([]) is None
+    assert calls == ["CloudOne", "CloudTwo"]
+
+
+def test_scope_shared_leaves():
+    func, calls = _scoped("CloudTwo & CloudOne & CloudTwo")
+    assert func(lambda endpoint: [endpoint]) == ["CloudTwo"]
+    assert calls == ["CloudTwo", "CloudOne", "CloudTwo"]
+
+    func, calls = _scoped("CloudTwo & CloudOne & CloudTwo",
+                          shared_leaves=True)
+    assert func(lambda endpoint: [endpoint]) == ["CloudTwo"]
+    assert calls == ["CloudTwo", "CloudOne"]
+
+    # each leaf is combined once, even if the combination replaces results
+    func, calls = _scoped("CloudOne & CloudTwo & CloudTwo",
+                          conj_res_func=_concat_conj_res_func,
+                          shared_leaves=True)
+    assert func(lambda endpoint: [endpoint]) \
+        == ["CloudOne", "CloudTwo", "CloudTwo"]
+    assert calls == ["CloudOne", "CloudTwo"]
+
+    func, calls = _scoped("(CloudOne & CloudTwo) & (CloudOne & CloudTwo)",
+                          conj_res_func=_concat_conj_res_func,
+                          shared_leaves=True, conj_parallel=True)
+    assert func(lambda endpoint: [endpoint]) \
+        == ["CloudOne", "CloudTwo", "CloudOne", "CloudTwo"]
+    assert sorted(calls) == ["CloudOne", "CloudTwo"]
+
+
+def test_scope_conjunction_parallel():
+    # every leaf waits for the others, so they must run concurrently
+    barrier = threading.Barrier(3, timeout=5)
+
+    def value(endpoint):
+        barrier.wait()
+        return [endpoint]
+
+    func, calls = _scoped("CloudOne & CloudTwo & CloudThree",
+                          conj_res_func=_concat_conj_res_func,
+                          conj_parallel=True)
+    assert func(value) == ["CloudOne", "CloudTwo", "CloudThree"]
+    assert sorted(calls) == ["CloudOne", "CloudThree", "CloudTwo"]
+
+
+def test_scope_disjunction_hedge():
+    # CloudOne hangs, so the alternative answers first
+    release = threading.Event()
+
+    def value(endpoint):
+        if endpoint == "CloudOne":
+            release.wait(5)
+        return endpoint
+
+    func, calls = _scoped("CloudOne | CloudTwo", disj_hedge=0.01)
+    assert func(value) == "CloudTwo"
+    assert calls == ["CloudOne", "CloudTwo"]
+    release.set()
+
+
+def test_scope_disjunction_hedge_timeout():
+    release = threading.Event()
+
+    func, calls = _scoped("CloudOne | CloudTwo", disj_hedge=0,
+                          disj_timeout=0.05)
+    with pytest.raises(TimeoutError):
+        func(lambda endpoint: release.wait(5))
+    release.set()
+
+
+def test_scope_disjunction_hedge_falsy(monkeypatch):
+    # both sides complete before the hedge waits for them, which is not a
+    # timeout
+    def submit_now(executor, func, *arguments, **keywords):
+        future = Future()
+        future.set_result(func(*arguments, **keywords))
+        return future
+
+    monkeypatch.setattr(dispatcher, "submit_in_context", submit_now)
+    func, calls = _scoped("CloudOne | CloudTwo", disj_hedge=0)
+    assert func(lambda endpoint: []) is None
+    assert calls == ["CloudOne", "CloudTwo"]
+
+
+def _async_scoped(expression, **keywords):
+    """Asynchronous twin of `_scoped` for a coroutine function."""
+
+    calls = []
+
+    @dispatcher.async_scope(None,
+                            extr_scp_func=lambda _, *a, **k: (SERVICE_TYPE,
+                                                              expression),
+                            **keywords)
+    async def func(delays):
+        endpoint = get_execution_scope()[1]
+        calls.append(endpoint)
+        await asyncio.sleep(delays.get(endpoint, 0))
+        # the execution scope is local to the task
+        assert get_execution_scope()[1] == endpoint
+        return [endpoint] if endpoint in delays else []
+
+    return func, calls
+
+
+def test_scope_health():
+    health = HealthRegistry(failure_threshold=1)
+
+    def value(endpoint):
+        if endpoint == "CloudOne":
+            raise ConnectionError("Connection refused")
+        return endpoint
+
+    func, calls = _scoped("CloudOne", health=health)
+    with pytest.raises(ConnectionError):
+        func(value)
+    assert health.snapshot()["CloudOne"]["state"] == "open"
+
+    # the open cloud is skipped in a disjunction, and fails fast otherwise
+    func, calls = _scoped("CloudOne | CloudTwo", health=health)
+    assert func(value) == "CloudTwo"
+    assert calls == ["CloudTwo"]
+
+    func, calls = _scoped("CloudOne & CloudTwo", health=health)
+    with pytest.raises(CircuitOpenError):
+        func(value)
+    assert calls == []
+
+
+def test_async_scope_conjunction():
+    # leaves are awaited concurrently, results are combined in order
+    func, calls = _async_scoped("CloudOne & CloudTwo",
+                                conj_res_func=_concat_conj_res_func)
+    delays = {"CloudOne": 0.05, "CloudTwo": 0}
+    assert asyncio.run(func(delays)) == ["CloudOne", "CloudTwo"]
+    assert sorted(calls) == ["CloudOne", "CloudTwo"]
+
+
+def test_async_scope_shared_leaves():
+    func, calls = _async_scoped("CloudOne & CloudTwo & CloudOne",
+                                conj_res_func=_concat_conj_res_func,
+                                shared_leaves=True)
+    delays = {"CloudOne": 0.01, "CloudTwo": 0}
+    assert asyncio.run(func(delays)) \
+        == ["CloudOne", "CloudTwo", "CloudOne"]
+    assert sorted(calls) == ["CloudOne", "CloudTwo"]
+
+    func, calls = _async_scoped("CloudOne & CloudTwo & CloudTwo",
+                                conj_res_func=_concat_conj_res_func,
+                                shared_leaves=True)
+    assert asyncio.run(func(delays)) \
+        == ["CloudOne", "CloudTwo", "CloudTwo"]
+    assert sorted(calls) == ["CloudOne", "CloudTwo"]
+
+
+def test_async_scope_disjunction():
+    func, calls = _async_scoped("CloudOne | CloudTwo")
+    assert asyncio.run(func({"CloudOne": 0, "CloudTwo": 0})) == ["CloudOne"]
+    assert calls == ["CloudOne"]
+
+    func, calls = _async_scoped("CloudOne | CloudTwo")
+    assert asyncio.run(func({"CloudTwo": 0})) == ["CloudTwo"]
+    assert calls == ["CloudOne", "CloudTwo"]
+
+
+def test_async_scope_disjunction_hedge():
+    func, calls = _async_scoped("CloudOne | CloudTwo", disj_hedge=0.01)
+    delays = {"CloudOne": 5, "CloudTwo": 0}
+    assert asyncio.run(func(delays)) == ["CloudTwo"]
+
+    func, calls = _async_scoped("CloudOne | CloudTwo", disj_hedge=0,
+                                disj_timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(func({"CloudOne": 5, "CloudTwo": 5}))
+
+
+def test_async_scope_error():
+    with pytest.raises(TypeError):
+        dispatcher.async_scope(None, extr_scp_func=None)(lambda: None)
+
+
+def test_compile_scope_cache():
+    dispatcher.compile_scope.cache_clear()
+    plan = dispatcher.compile_scope("CloudOne & (CloudTwo | CloudThree)")
+    assert str(plan) == "(CloudOne and (CloudTwo or CloudThree))"
+    assert dispatcher.compile_scope("CloudOne & (CloudTwo | CloudThree)") \
+        is plan
+
+    info = dispatcher.compile_scope.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_compile_scope_error():
+    with pytest.raises(ValueError):
+        dispatcher.compile_scope("'CloudOne'")
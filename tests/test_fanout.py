@@ -0,0 +1,87 @@
+import argparse
+import threading
+
+from openstackoid.client.fanout import (CLOUD_COLUMN, lister_scope,
+                                        show_one_scope, volume_list_scope)
+from openstackoid.configuration import get_execution_scope
+from openstackoid.utils import get_default_scope
+
+
+class FakeApp:
+
+    def __init__(self, scope):
+        self.options = argparse.Namespace(oid_scope={"network": scope})
+
+
+class FakeCommand:
+
+    def __init__(self, scope, clouds=1):
+        self.app = FakeApp(scope)
+        # every cloud waits for the others, so they must run concurrently
+        self.barrier = threading.Barrier(clouds, timeout=5)
+
+    @lister_scope("network", None)
+    def list_networks(self, parsed_args):
+        self.barrier.wait()
+        cloud = get_execution_scope()[1]
+        return ("ID", "Name"), [("1", f"private-{cloud}")]
+
+    @show_one_scope("network", None)
+    def show_network(self, parsed_args):
+        cloud = get_execution_scope()[1]
+        if cloud == "CloudOne":
+            return ("id", "name"), ("1", "private")
+        if cloud == "CloudThree":
+            return ("id", "status"), ("1", "ACTIVE")
+        return ("id", "mtu"), ("1", 1450)
+
+
+def test_lister_scope():
+    command = FakeCommand("CloudOne & CloudTwo & CloudThree", clouds=3)
+    parsed_args = argparse.Namespace(sort="name", limit=None, marker=None)
+    columns, rows = command.list_networks(parsed_args)
+    assert columns == ("ID", "Name", CLOUD_COLUMN)
+
+    # same IDs in distinct clouds are kept
+    assert list(rows) == [("1", "private-CloudOne", "CloudOne"),
+                          ("1", "private-CloudThree", "CloudThree"),
+                          ("1", "private-CloudTwo", "CloudTwo")]
+
+
+def test_show_one_scope():
+    command = FakeCommand("CloudOne & CloudTwo")
+    columns, data = command.show_network(argparse.Namespace())
+    assert columns == ("id", "name", CLOUD_COLUMN, "mtu")
+    assert data == ("1\n1", "private\n", "CloudOne\nCloudTwo", "\n1450")
+
+
+def test_show_one_scope_padding():
+    # a column of the last cloud only lines up with the clouds
+    command = FakeCommand("CloudOne & CloudTwo & CloudThree")
+    columns, data = command.show_network(argparse.Namespace())
+    values = dict(zip(columns, data))
+    assert values[CLOUD_COLUMN] == "CloudOne\nCloudTwo\nCloudThree"
+    assert values["status"] == "\n\nACTIVE"
+    assert values["mtu"] == "\n1450\n"
+    assert values["name"] == "private\n\n"
+
+
+class FakeListVolume:
+
+    def __init__(self):
+        # the scope of the shell when `--oid-scope` is not set
+        self.app = argparse.Namespace(
+            options=argparse.Namespace(oid_scope=get_default_scope()))
+
+    @volume_list_scope(None)
+    def take_action(self, parsed_args):
+        return ("ID", "Name"), [("1", "data")]
+
+
+def test_volume_list_default_scope(monkeypatch):
+    monkeypatch.delenv("OS_SCOPE_VOLUMEV3", raising=False)
+    monkeypatch.setenv("OS_REGION_NAME", "CloudOne")
+    parsed_args = argparse.Namespace(sort=None, limit=None, marker=None)
+    columns, rows = FakeListVolume().take_action(parsed_args)
+    assert columns == ("ID", "Name", CLOUD_COLUMN)
+    assert list(rows) == [("1", "data", "CloudOne")]
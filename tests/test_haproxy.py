@@ -0,0 +1,39 @@
+from openstackoid.catalog import Service, ServiceCatalog
+from openstackoid.haproxy import (BACKENDS_MAP, SERVICES_MAP,
+                                  make_backends_map, make_services_map, main)
+
+
+SERVICES = [
+    Service("image", "CloudOne", "http://192.168.141.245:8888/image",
+            "public"),
+    Service("image", "CloudTwo", "http://192.168.142.245:8888/image",
+            "public"),
+    Service("image", "CloudTwo", "http://192.168.142.245:8888/image/v2",
+            "public")
+]
+
+
+def test_make_maps():
+    catalog = ServiceCatalog(SERVICES)
+    assert make_services_map(catalog) == [
+        ("192.168.141.245:8888/image", "image/public"),
+        ("192.168.142.245:8888/image", "image/public"),
+        ("192.168.142.245:8888/image/v2", "image/public")]
+
+    # first match per service type, interface and cloud
+    assert make_backends_map(catalog) == [
+        ("image/public/CloudOne", "CloudOne_image_public"),
+        ("image/public/CloudTwo", "CloudTwo_image_public")]
+
+
+def test_main(tmp_path):
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(
+        '[{"Service Type": "image", "Interface": "public", '
+        '"URL": "http://one/image", "Region": "CloudOne"}]')
+
+    main([f"file://{catalog_path}", str(tmp_path)])
+    assert (tmp_path / SERVICES_MAP).read_text().splitlines()[1:] \
+        == ["one/image image/public"]
+    assert (tmp_path / BACKENDS_MAP).read_text().splitlines()[1:] \
+        == ["image/public/CloudOne CloudOne_image_public"]
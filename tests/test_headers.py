@@ -0,0 +1,27 @@
+from requests import Request
+
+from openstackoid.http.headers import (HeaderView, get_header_view,
+                                       sanitize_headers)
+
+
+HEADERS = {b"X-Auth-Token": b"gAAAAABc", "X-Scope": "%7B%22image%22%7D"}
+
+
+def test_header_view():
+    view = HeaderView(HEADERS)
+    assert "X-Auth-Token" in view
+    assert "X-Subject-Token" not in view
+    assert view["X-Auth-Token"] == "gAAAAABc"
+    assert view["X-Scope"] == '{"image"}'
+    assert dict(view) == sanitize_headers(HEADERS)
+
+
+def test_get_header_view():
+    request = Request("GET", "http://one/image", headers=dict(HEADERS))
+    view = get_header_view(request)
+    assert view["X-Scope"] == '{"image"}'
+    assert get_header_view(request) is view
+
+    # the sanitized value follows the updates of the raw header
+    request.headers["X-Scope"] = "%7B%7D"
+    assert get_header_view(request)["X-Scope"] == "{}"
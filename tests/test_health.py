@@ -0,0 +1,86 @@
+import pytest
+
+from openstackoid.health import (CLOSED, HALF_OPEN, OPEN, CircuitOpenError,
+                                 HealthRegistry)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise ConnectionError("Connection refused")
+
+
+def test_health_registry():
+    clock = FakeClock()
+    health = HealthRegistry(failure_threshold=2, reset_timeout=10.0,
+                            latency_weight=0.5, clock=clock)
+    assert health.track("CloudOne", lambda: 42) == 42
+    health.record_success("CloudOne", 1.0)
+    health.record_success("CloudOne", 3.0)
+    assert health.snapshot()["CloudOne"]["latency"] == 1.75
+
+    # a single failure keeps the breaker closed
+    with pytest.raises(ConnectionError):
+        health.track("CloudTwo", _fail)
+    assert health.snapshot()["CloudTwo"]["state"] == CLOSED
+
+    # an unhealthy result is a failure as well
+    health.track("CloudTwo", lambda: 503, healthy=lambda status: status < 500)
+    assert health.snapshot()["CloudTwo"]["state"] == OPEN
+    assert health.is_open("CloudTwo")
+    with pytest.raises(CircuitOpenError):
+        health.track("CloudTwo", lambda: 42)
+    assert health.snapshot()["CloudTwo"]["total_failures"] == 2
+
+
+def test_health_registry_half_open():
+    clock = FakeClock()
+    health = HealthRegistry(failure_threshold=1, reset_timeout=10.0,
+                            clock=clock)
+    health.record_failure("CloudOne")
+    assert health.is_open("CloudOne")
+
+    # after the reset timeout, a single probe goes through
+    clock.now = 10.0
+    assert not health.is_open("CloudOne")
+    assert health.acquire("CloudOne")
+    assert health.snapshot()["CloudOne"]["state"] == HALF_OPEN
+    assert not health.acquire("CloudOne")
+
+    # a failed probe opens the breaker again, a successful one closes it
+    health.record_failure("CloudOne")
+    assert health.is_open("CloudOne")
+    clock.now = 20.0
+    assert health.track("CloudOne", lambda: 42) == 42
+    assert health.snapshot()["CloudOne"]["state"] == CLOSED
+    assert health.snapshot()["CloudOne"]["failures"] == 0
+
+
+def test_health_registry_interrupted_probe():
+    clock = FakeClock()
+    health = HealthRegistry(failure_threshold=1, reset_timeout=10.0,
+                            clock=clock)
+    health.record_failure("CloudOne")
+    clock.now = 10.0
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    # the probe is released, so the cloud is probed again
+    with pytest.raises(KeyboardInterrupt):
+        health.track("CloudOne", interrupt)
+    assert not health.is_open("CloudOne")
+
+    # a failing health evaluation is a failure of the probe
+    with pytest.raises(ValueError):
+        health.track("CloudOne", lambda: 42, healthy=lambda result: int("x"))
+    assert health.is_open("CloudOne")
+    clock.now = 20.0
+    assert health.track("CloudOne", lambda: 42) == 42
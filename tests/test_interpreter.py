@@ -0,0 +1,164 @@
+import json
+
+from requests import Request
+
+from openstackoid import interpreter as interpreter_module
+from openstackoid.catalog import ServiceCatalog
+from openstackoid.http import codec
+from openstackoid.interpreter import (OidInterpreter, Service,
+                                      get_interpreter_from_services)
+
+
+IDENTITY_ONE = Service(service_type="identity", cloud="CloudOne",
+                       url="http://one/identity", interface="admin")
+
+
+IDENTITY_TWO = Service(service_type="identity", cloud="CloudTwo",
+                       url="http://two/identity", interface="admin")
+
+
+IMAGE_ONE = Service(service_type="image", cloud="CloudOne",
+                    url="http://one/image", interface="public")
+
+
+IMAGE_TWO = Service(service_type="image", cloud="CloudTwo",
+                    url="http://two/image", interface="public")
+
+
+IMAGE_TWO_V2 = Service(service_type="image", cloud="CloudTwo",
+                       url="http://two/image/v2", interface="public")
+
+
+SERVICES = [IDENTITY_ONE, IDENTITY_TWO, IMAGE_ONE, IMAGE_TWO, IMAGE_TWO_V2]
+
+
+SCOPE = {"identity": "CloudOne", "image": "CloudTwo"}
+
+
+def _request(url, scope=SCOPE):
+    return Request("GET", url, headers={"X-Scope": json.dumps(scope)})
+
+
+def test_get_service():
+    interpreter = get_interpreter_from_services(SERVICES)
+    assert interpreter.get_service(_request("http://one/image/v2")) \
+        == IMAGE_ONE
+    assert interpreter.get_service(_request("http://unknown/image")) is None
+
+
+def test_get_service_first_match():
+    # first service in the list wins over the longest matching prefix
+    interpreter = get_interpreter_from_services(SERVICES)
+    assert interpreter.get_service(_request("http://two/image/v2/images")) \
+        == IMAGE_TWO
+
+    interpreter = get_interpreter_from_services(list(reversed(SERVICES)))
+    assert interpreter.get_service(_request("http://two/image/v2/images")) \
+        == IMAGE_TWO_V2
+
+
+def test_interpret():
+    interpreter = get_interpreter_from_services(SERVICES)
+    request = interpreter.iinterpret(_request("http://one/image/v2/images"))
+    assert request.url == "http://two/image/v2/images"
+    assert json.loads(request.headers["X-Scope"]) == SCOPE
+
+
+def test_interpret_endpoint():
+    interpreter = get_interpreter_from_services(SERVICES)
+    request = interpreter.iinterpret(_request("http://two/image/v2/images"),
+                                     endpoint="CloudOne")
+    assert request.url == "http://one/image/v2/images"
+
+
+def test_interpret_identity_headers():
+    interpreter = get_interpreter_from_services(SERVICES)
+    request = interpreter.iinterpret(_request("http://two/identity/v3"))
+    assert request.url == "http://one/identity/v3"
+    assert request.headers["X-Identity-Cloud"] == "CloudOne"
+    assert request.headers["X-Identity-Url"] == IDENTITY_ONE.url
+
+
+def test_iinterpret_shares_body():
+    interpreter = get_interpreter_from_services(SERVICES)
+    payload = bytearray(b"image")
+    request = Request("PUT", "http://one/image/v2/images/file",
+                      headers={"X-Scope": json.dumps(SCOPE)},
+                      data=payload).prepare()
+
+    interpreted = interpreter.iinterpret(request)
+    interpreted.register_hook("response", lambda response, **_: response)
+    assert interpreted.body is request.body
+    assert interpreted.url == "http://two/image/v2/images/file"
+    assert request.url == "http://one/image/v2/images/file"
+    assert interpreted.hooks["response"] != request.hooks["response"]
+
+
+def test_rewrite_cache():
+    interpreter = get_interpreter_from_services(SERVICES)
+    rewrite = interpreter.get_rewrite(IDENTITY_TWO, "CloudOne")
+    assert rewrite.apply("http://two/identity/v3") == "http://one/identity/v3"
+    assert dict(rewrite.headers) == {"X-Identity-Cloud": "CloudOne",
+                                     "X-Identity-Url": IDENTITY_ONE.url}
+    assert interpreter.get_rewrite(IMAGE_ONE, "CloudTwo").headers == {}
+
+    # rewrites are computed on demand, once, until the catalog is swapped
+    assert interpreter.get_rewrite(IDENTITY_TWO, "CloudOne") is rewrite
+    assert len(interpreter.rewrites) == 2
+    interpreter.update_catalog(interpreter.catalog)
+    assert len(interpreter.rewrites) == 0
+
+
+def test_rewrite_cache_update(monkeypatch):
+    interpreter = get_interpreter_from_services(SERVICES)
+    catalog = ServiceCatalog(SERVICES[2:])
+    make_rewrite = interpreter_module.make_rewrite
+
+    def make_rewrite_during_update(*arguments):
+        interpreter.update_catalog(catalog)
+        return make_rewrite(*arguments)
+
+    # a rewrite of the previous catalog is not cached with the new one
+    monkeypatch.setattr(interpreter_module, "make_rewrite",
+                        make_rewrite_during_update)
+    assert interpreter.get_rewrite(IMAGE_ONE, "CloudTwo")
+    assert interpreter.catalog is catalog
+    assert len(interpreter.rewrites) == 0
+
+
+class LazyCatalog(ServiceCatalog):
+    """Catalog counting the loads of its services, as `SqliteServiceCatalog`.
+
+    """
+
+    loads = 0
+
+    @property
+    def services(self):
+        self.loads += 1
+        return self._services
+
+    @services.setter
+    def services(self, services):
+        self._services = services
+
+    def __len__(self):
+        return len(self._services)
+
+
+def test_compact_wire_format():
+    catalog = LazyCatalog(SERVICES)
+    interpreter = OidInterpreter.from_catalog(catalog, wire_format="compact")
+    # the codec of the catalog is only built on first use
+    assert catalog.loads == 0
+
+    request = _request("http://one/image/v2/images").prepare()
+    interpreter.interpret(request)
+    value = request.headers["X-Scope"]
+    assert value.startswith(f"~1:{interpreter.wire_codec.digest}:")
+    assert catalog.loads == 1
+    assert interpreter.get_scope(request) == SCOPE
+
+    # the codec of a swapped catalog is dropped
+    interpreter.update_catalog(ServiceCatalog(SERVICES[:-1]))
+    assert catalog not in codec._COMPACT_CODECS
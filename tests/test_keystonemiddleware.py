@@ -0,0 +1,179 @@
+import datetime
+import importlib
+import logging
+import sys
+import types
+
+
+class FakeKeystoneObject:
+    """Stand-in of the keystoneauth1 and keystonemiddleware classes."""
+
+    def __init__(self, *arguments, **keywords):
+        self.arguments = arguments
+        vars(self).update(keywords)
+
+
+class FakeIdentityClient(FakeKeystoneObject):
+
+    www_authenticate_uri = None
+
+    def verify_token(self, user_token, retry=True, allow_expired=False):
+        return None
+
+
+def _stub_module(name, **attributes):
+    """Register a stand-in of the module `name` if it is not installed."""
+
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        module = sys.modules[name] = types.ModuleType(name)
+        vars(module).update(attributes)
+        return module
+
+
+# keystoneauth1 and keystonemiddleware are only installed along with OpenStack
+_stub_module("keystoneauth1")
+_stub_module("keystoneauth1.adapter", Adapter=FakeKeystoneObject)
+_stub_module("keystoneauth1.identity",
+             v3=types.SimpleNamespace(Password=FakeKeystoneObject))
+_stub_module("keystoneauth1.session", Session=FakeKeystoneObject)
+_stub_module("keystonemiddleware")
+_stub_module("keystonemiddleware.auth_token")
+_stub_module("keystonemiddleware.auth_token._identity",
+             IdentityServer=FakeIdentityClient)
+
+from openstackoid import keystonemiddleware  # noqa: E402
+
+
+CLOUD_NAME = "CloudTwo"
+
+
+TOKEN = "gAAAAABc"
+
+
+class FakeMemcache:
+    """Local stand-in of a memcached client."""
+
+    def __init__(self):
+        self.values = {}
+        self.times = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, time=0):
+        self.values[key] = value
+        self.times[key] = time
+        return True
+
+
+class FakeIdentityServer:
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def verify_token(self, user_token, retry=True, allow_expired=False):
+        self.calls += 1
+        return self.data
+
+
+def _token_data(delta):
+    expires = datetime.datetime.now(datetime.timezone.utc) + delta
+    return {"token": {"expires_at": expires.isoformat()}}
+
+
+def test_cached_identity_server():
+    k_client = FakeIdentityServer(_token_data(datetime.timedelta(hours=1)))
+    token_cache = keystonemiddleware.TokenCache()
+    server = keystonemiddleware.CachedIdentityServer(k_client, CLOUD_NAME,
+                                                     token_cache)
+    assert server.verify_token(TOKEN) == k_client.data
+    assert server.verify_token(TOKEN) == k_client.data
+    assert k_client.calls == 1
+
+    # the cache is per identity cloud
+    other = keystonemiddleware.CachedIdentityServer(k_client, "CloudOne",
+                                                    token_cache)
+    other.verify_token(TOKEN)
+    assert k_client.calls == 2
+
+
+def test_token_cache_shared_backend():
+    backend = FakeMemcache()
+    token_cache = keystonemiddleware.TokenCache(backend, max_ttl=60)
+    token_cache.set(CLOUD_NAME, TOKEN,
+                    _token_data(datetime.timedelta(hours=1)))
+    assert list(backend.times.values()) == [60]
+
+    # expired tokens are not cached
+    token_cache.set(CLOUD_NAME, "expired",
+                    _token_data(datetime.timedelta(hours=-1)))
+    assert token_cache.get(CLOUD_NAME, "expired") is None
+    assert token_cache.get(CLOUD_NAME, TOKEN) is not None
+
+
+class FakeRequest:
+
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeAuthProtocol:
+    """Stand-in of a `keystonemiddleware.auth_token.BaseAuthProtocol`."""
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+        self._conf = {"auth_url": "http://one/identity"}
+        self._identity_server = None
+
+    @keystonemiddleware.target_good_keystone
+    def __call__(self, request):
+        return self
+
+
+def _identity_request(cloud_name, cloud_auth_url):
+    return FakeRequest({"X-Identity-Cloud": cloud_name,
+                        "X-Identity-Url": cloud_auth_url,
+                        "X-Scope": '{"identity": "%s"}' % cloud_name})
+
+
+def test_target_good_keystone():
+    keystonemiddleware.K_CLIENTS.clear()
+    middleware = FakeAuthProtocol()
+    view = middleware(_identity_request(CLOUD_NAME, "http://two/identity"))
+
+    # the view targets the keystone of the cloud, the middleware is unchanged
+    assert view is not middleware
+    assert middleware._identity_server is None
+    assert view._www_authenticate_uri == "http://two/identity"
+    assert view._auth.auth_url == "http://two/identity/v3"
+    assert isinstance(view._identity_server,
+                      keystonemiddleware.CachedIdentityServer)
+    assert view._identity_server._cloud_name == CLOUD_NAME
+
+    # one view per cloud, reused by the next requests
+    assert middleware(_identity_request(
+        CLOUD_NAME, "http://two/identity")) is view
+    other = middleware(_identity_request("CloudOne", "http://one/identity"))
+    assert other is not view
+    assert other._www_authenticate_uri == "http://one/identity"
+    assert len(keystonemiddleware.K_CLIENTS) == 2
+
+
+def test_target_good_keystone_scope():
+    keystonemiddleware.K_CLIENTS.clear()
+    middleware = FakeAuthProtocol()
+    request = _identity_request(CLOUD_NAME, "http://two/identity")
+    view = middleware(request)
+
+    # the session of a view sends the scope of its requests
+    request.headers["X-Scope"] = '{"identity": "%s", "image": "CloudOne"}' \
+        % CLOUD_NAME
+    other = middleware(request)
+    assert other is not view
+    assert view._session.additional_headers["X-Scope"] \
+        == '{"identity": "%s"}' % CLOUD_NAME
+    assert other._session.additional_headers["X-Scope"] \
+        == request.headers["X-Scope"]
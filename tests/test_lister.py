@@ -0,0 +1,179 @@
+from concurrent.futures import Future
+
+import argparse
+import threading
+import time
+
+import pytest
+
+from openstackoid.client.image import image_list_scope
+from openstackoid.client.lister import MergedRows, parse_marker, parse_sort
+from openstackoid.configuration import get_execution_scope
+
+
+COLUMNS = ("ID", "Name", "Status")
+
+
+IMAGES = {
+    "CloudOne": [("1", "cirros", "active"), ("3", "debian", "active"),
+                 ("5", "ubuntu", "active")],
+    "CloudTwo": [("2", "centos", "active"), ("3", "debian", "active"),
+                 ("4", "fedora", "queued")]
+}
+
+
+class FakeApp:
+
+    def __init__(self, scope):
+        self.options = argparse.Namespace(oid_scope={"image": scope})
+
+
+class FakeListImage:
+    """Stand-in of `openstackclient.image.v2.image.ListImage`."""
+
+    def __init__(self, scope, images=IMAGES, delays=None):
+        self.app = FakeApp(scope)
+        self.images = images
+        self.delays = delays or {}
+        self.markers = {}
+        self.slow = None
+
+    @image_list_scope(None)
+    def take_action(self, parsed_args):
+        cloud = get_execution_scope()[1]
+        self.markers[cloud] = parsed_args.marker
+        if cloud == self.slow:
+            self.answer.wait(timeout=5)
+        time.sleep(self.delays.get(cloud, 0))
+        if cloud not in self.images:
+            raise ConnectionError(f"{cloud} is unreachable")
+        images = self.images[cloud]
+        if parsed_args.marker:
+            ids = [image[0] for image in images]
+            images = images[ids.index(parsed_args.marker) + 1:]
+        return COLUMNS, (image for image in images[:parsed_args.limit])
+
+
+def _answered(rows):
+    source = Future()
+    source.set_result((COLUMNS, rows))
+    return source
+
+
+def _parsed_args(sort=None, limit=None, marker=None):
+    return argparse.Namespace(sort=sort, limit=limit, marker=marker)
+
+
+def test_parse_sort():
+    assert parse_sort("name:asc", COLUMNS) == ([1], False)
+    assert parse_sort("status:desc,name:desc", COLUMNS) == ([2, 1], True)
+    assert parse_sort("name,status:desc", COLUMNS) == ([1], False)
+    assert parse_sort("created_at", COLUMNS) == ([], False)
+    assert parse_sort(None, COLUMNS) == ([], False)
+
+
+def test_merged_rows():
+    parts = [(cloud, _answered(rows)) for cloud, rows in IMAGES.items()]
+    rows = MergedRows(parts, sort_indexes=[1], id_index=0, limit=4)
+    assert [row[1] for row in rows] == ["centos", "cirros", "debian",
+                                        "fedora"]
+    assert parse_marker(rows.next_marker) == {"CloudOne": "3",
+                                              "CloudTwo": "4"}
+
+
+def test_image_list_merge():
+    command = FakeListImage("CloudOne & CloudTwo")
+    columns, rows = command.take_action(_parsed_args(sort="name", limit=2))
+    assert columns == COLUMNS
+    assert list(rows) == [("2", "centos", "active"),
+                          ("1", "cirros", "active")]
+    assert rows.next_marker == "CloudOne=1,CloudTwo=2"
+
+    # the next page starts after the marker of each cloud
+    columns, rows = command.take_action(
+        _parsed_args(sort="name", limit=2, marker=rows.next_marker))
+    assert command.markers == {"CloudOne": "1", "CloudTwo": "2"}
+    assert [row[1] for row in rows] == ["debian", "fedora"]
+
+
+def test_merged_rows_arrival():
+    pending = Future()
+    rows = iter(MergedRows([("CloudOne", pending),
+                            ("CloudTwo", _answered(IMAGES["CloudTwo"]))],
+                           id_index=0, arrival=True))
+
+    # rows of the cloud that answered do not wait for the other one
+    assert [next(rows) for _ in range(3)] == IMAGES["CloudTwo"]
+    pending.set_result((COLUMNS, IMAGES["CloudOne"]))
+    assert list(rows) == [("1", "cirros", "active"), ("5", "ubuntu", "active")]
+
+
+def test_merged_rows_limit():
+    late = Future()
+    timer = threading.Timer(2, late.set_result,
+                            [(COLUMNS, IMAGES["CloudTwo"])])
+    timer.start()
+    failed = Future()
+    failed.set_exception(ConnectionError("CloudThree is unreachable"))
+    parts = [("CloudOne", _answered(IMAGES["CloudOne"])),
+             ("CloudTwo", late), ("CloudThree", failed)]
+
+    # the limit is met by the first cloud, the others are not reached
+    for arrival in (True, False):
+        start = time.monotonic()
+        rows = MergedRows(parts, id_index=0, limit=3, arrival=arrival)
+        assert list(rows) == IMAGES["CloudOne"]
+        assert rows.next_marker == "CloudOne=5"
+        assert time.monotonic() - start < 1
+    timer.cancel()
+
+
+def test_image_list_progressive():
+    command = FakeListImage("CloudOne & CloudTwo")
+    command.slow, command.answer = "CloudOne", threading.Event()
+    columns, rows = command.take_action(_parsed_args())
+    assert columns == COLUMNS
+
+    rows = iter(rows)
+    assert next(rows) == ("2", "centos", "active")
+    command.answer.set()
+    assert [row[1] for row in rows] == ["debian", "fedora", "cirros",
+                                        "ubuntu"]
+
+
+def test_image_list_concurrent():
+    images = dict(IMAGES, CloudThree=[("6", "alpine", "active")])
+    delays = {"CloudOne": 0.2, "CloudTwo": 0.2, "CloudThree": 0.4}
+    command = FakeListImage("CloudOne & CloudTwo & CloudThree", images,
+                            delays)
+
+    # every cloud is queried before waiting for the first one to answer
+    start = time.monotonic()
+    columns, rows = command.take_action(_parsed_args())
+    assert len(list(rows)) == 6
+    assert time.monotonic() - start < 0.55
+
+
+def test_image_list_failure():
+    command = FakeListImage("CloudOne & CloudTwo & CloudThree",
+                            delays={"CloudThree": 0.1})
+
+    # the error of a cloud is raised once its rows are reached
+    columns, rows = command.take_action(_parsed_args())
+    rows = iter(rows)
+    assert next(rows) in IMAGES["CloudOne"] + IMAGES["CloudTwo"]
+    with pytest.raises(ConnectionError):
+        list(rows)
+
+
+def test_image_list_limit():
+    command = FakeListImage("CloudOne & CloudTwo & CloudThree")
+    command.slow, command.answer = "CloudTwo", threading.Event()
+
+    # the limit is met by CloudOne, so the listing neither waits for the slow
+    # CloudTwo nor fails on the unreachable CloudThree
+    start = time.monotonic()
+    columns, rows = command.take_action(_parsed_args(limit=2))
+    assert list(rows) == IMAGES["CloudOne"][:2]
+    assert time.monotonic() - start < 1
+    command.answer.set()
@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+from openstackoid.interpreter import Service, get_interpreter_from_services
+from openstackoid.proxy import OidProxy
+
+
+SCOPE = json.dumps({"image": "CloudTwo"})
+
+
+class StubBackend:
+    """Local stand-in of an OpenStack service, that echoes requests."""
+
+    def __init__(self, cloud, drop=None):
+        self.cloud = cloud
+        # rank of the request of a connection that is dropped unanswered
+        self.drop = drop
+        self.connections = 0
+        self.requests = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        rank = 0
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+
+            lines = head.decode("latin-1").split("\r\n")[:-2]
+            headers = dict(line.split(": ", 1) for line in lines[1:])
+            body = b""
+            if headers.get("Transfer-Encoding") == "chunked":
+                while True:
+                    size = int(await reader.readuntil(b"\r\n"), 16)
+                    body += (await reader.readexactly(size + 2))[:-2]
+                    if not size:
+                        break
+            else:
+                length = int(headers.get("Content-Length", 0))
+                body = await reader.readexactly(length)
+
+            self.requests.append((lines[0], headers, body))
+            rank += 1
+            if rank == self.drop:
+                break
+
+            answer = json.dumps({"cloud": self.cloud,
+                                 "body": body.decode()}).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s"
+                         % (len(answer), answer))
+            await writer.drain()
+
+        writer.close()
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")[:-2]
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    body = await reader.readexactly(int(headers["Content-Length"]))
+    return lines[0], body
+
+
+async def _proxy_requests(payloads, drop=None):
+    backends = [StubBackend("CloudOne"), StubBackend("CloudTwo", drop)]
+    servers = [await asyncio.start_server(b.handle, "127.0.0.1", 0)
+               for b in backends]
+    ports = [s.sockets[0].getsockname()[1] for s in servers]
+    services = [Service("image", b.cloud, f"http://127.0.0.1:{p}/image",
+                        "public") for b, p in zip(backends, ports)]
+
+    proxy = OidProxy(get_interpreter_from_services(services))
+    proxy_server = await proxy.serve("127.0.0.1", 0)
+    proxy_port = proxy_server.sockets[0].getsockname()[1]
+
+    responses = []
+    for payload in payloads:
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy_port)
+        writer.write(payload.replace(b"{port}", str(ports[0]).encode()))
+        while True:
+            try:
+                responses.append(await _read_response(reader))
+            except asyncio.IncompleteReadError:
+                break
+        writer.close()
+
+    proxy.pool.close()
+    for server in servers + [proxy_server]:
+        server.close()
+        await server.wait_closed()
+
+    return backends, responses
+
+
+def test_proxy_routes_scope():
+    request = (b"GET /image/v2/images HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+               b"X-Scope: %s\r\n\r\n" % SCOPE.encode())
+    upload = (b"PUT /image/v2/images/1/file HTTP/1.1\r\n"
+              b"Host: 127.0.0.1:{port}\r\nX-Scope: %s\r\n"
+              b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+              b"5\r\ncirro\r\n1\r\ns\r\n0\r\n\r\n" % SCOPE.encode())
+    backends, responses = asyncio.run(_proxy_requests([request + upload]))
+
+    # both requests are forwarded to CloudTwo, over one pooled connection
+    assert [json.loads(body) for _, body in responses] \
+        == [{"cloud": "CloudTwo", "body": ""},
+            {"cloud": "CloudTwo", "body": "cirros"}]
+    assert backends[0].requests == []
+    assert backends[1].connections == 1
+    assert [line for line, _, _ in backends[1].requests] \
+        == ["GET /image/v2/images HTTP/1.1",
+            "PUT /image/v2/images/1/file HTTP/1.1"]
+    assert "Connection" not in backends[1].requests[1][1]
+
+
+def test_proxy_error():
+    # without scope, the request cannot be interpreted
+    request = (b"GET /image/v2/images HTTP/1.1\r\n"
+               b"Host: 127.0.0.1:{port}\r\n\r\n")
+    backends, responses = asyncio.run(_proxy_requests([request]))
+    assert responses[0][0] == "HTTP/1.1 400 Bad Request"
+    assert backends[0].requests == backends[1].requests == []
+
+
+def test_proxy_replay():
+    request = (b"%s /image/v2/images/1 HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+               b"X-Scope: %s\r\n%s\r\n")
+    get = request % (b"GET", SCOPE.encode(), b"")
+    last_get = request % (b"GET", SCOPE.encode(), b"Connection: close\r\n")
+
+    # a safe request is replayed when the pooled connection fails
+    backends, responses = asyncio.run(_proxy_requests([get + last_get],
+                                                      drop=2))
+    assert [line for line, _ in responses] == ["HTTP/1.1 200 OK"] * 2
+    assert backends[1].connections == 2
+    assert len(backends[1].requests) == 3
+
+    # another one may have been processed by the backend, and is not
+    delete = request % (b"DELETE", SCOPE.encode(), b"Connection: close\r\n")
+    backends, responses = asyncio.run(_proxy_requests([get + delete],
+                                                      drop=2))
+    assert [line for line, _ in responses] \
+        == ["HTTP/1.1 200 OK", "HTTP/1.1 502 Bad Gateway"]
+    assert [line for line, _, _ in backends[1].requests] \
+        == ["GET /image/v2/images/1 HTTP/1.1",
+            "DELETE /image/v2/images/1 HTTP/1.1"]
@@ -0,0 +1,65 @@
+from requests import PreparedRequest, Session
+
+from openstackoid.catalog import ServiceCatalog
+from openstackoid.http import request
+from openstackoid.http.codec import COMPACT_SCOPE_PREFIX, decode_scope
+from openstackoid.http.headers import SCOPE_DELIMITER
+from openstackoid.interpreter import OidInterpreter, Service
+
+
+SERVICES = [Service(service_type="identity", cloud="CloudOne",
+                    url="http://one/identity", interface="admin"),
+            Service(service_type="image", cloud="CloudOne",
+                    url="http://one/image", interface="public"),
+            Service(service_type="image", cloud="CloudTwo",
+                    url="http://two/image", interface="public")]
+
+
+SCOPE = {"identity": "CloudOne", "image": "CloudTwo"}
+
+
+def _send_request(monkeypatch, wire_format):
+    interpreter = OidInterpreter.from_catalog(ServiceCatalog(SERVICES),
+                                              wire_format=wire_format)
+    sent = {}
+
+    def session_request(session, method, url, headers=None, **kwargs):
+        sent.update(headers)
+
+    monkeypatch.setattr(request, "SCOPE_WIRE_FORMAT", wire_format)
+    monkeypatch.setattr(request, "get_interpreter", lambda url: interpreter)
+    monkeypatch.setattr(request, "session_request", session_request)
+    monkeypatch.setattr(request, "get_shell_scope", lambda: dict(SCOPE))
+    monkeypatch.setattr(request, "get_execution_scope", lambda: None)
+
+    Session().request("GET", "http://one/image/v2/images",
+                      headers={"X-Auth-Token": "tok"})
+    return interpreter, sent
+
+
+def test_session_request_compact_scope(monkeypatch):
+    interpreter, sent = _send_request(monkeypatch, "compact")
+
+    # the scope of both headers is in the compact format
+    assert sent["X-Scope"].startswith(COMPACT_SCOPE_PREFIX)
+    assert sent["X-Auth-Token"] == f"tok{SCOPE_DELIMITER}{sent['X-Scope']}"
+    assert decode_scope(sent["X-Scope"]) == SCOPE
+
+
+def test_interpret_compact_token_scope(monkeypatch):
+    # the scope piggybacked by a client in json is re-encoded as X-Scope is
+    with monkeypatch.context() as json_patch:
+        _, sent = _send_request(json_patch, "json")
+    assert sent["X-Auth-Token"].endswith(sent["X-Scope"])
+    assert not sent["X-Scope"].startswith(COMPACT_SCOPE_PREFIX)
+
+    interpreter = OidInterpreter.from_catalog(ServiceCatalog(SERVICES),
+                                              wire_format="compact")
+    prepared = PreparedRequest()
+    prepared.prepare(method="GET", url="http://one/image/v2/images",
+                     headers=sent)
+    interpreter.interpret(prepared)
+    x_scope = prepared.headers["X-Scope"]
+    assert prepared.url == "http://two/image/v2/images"
+    assert x_scope.startswith(COMPACT_SCOPE_PREFIX)
+    assert prepared.headers["X-Auth-Token"] == f"tok{SCOPE_DELIMITER}{x_scope}"
@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from requests import PreparedRequest, Request, Session
+from requests.exceptions import ConnectionError
+
+from openstackoid.health import HealthRegistry
+from openstackoid.http.send import send_scope
+from openstackoid.interpreter import Service, get_interpreter_from_services
+
+
+SERVICES = [Service(service_type="image", cloud="CloudOne",
+                    url="http://one/image", interface="public"),
+            Service(service_type="image", cloud="CloudTwo",
+                    url="http://two/image", interface="public")]
+
+
+def _request(data, scope="CloudOne & CloudTwo"):
+    return Request("PUT", "http://one/image/v2/images/file",
+                   headers={"X-Scope": json.dumps({"image": scope})},
+                   data=data).prepare()
+
+
+def _send(request: PreparedRequest):
+    return request.url, request.body.read() \
+        if hasattr(request.body, "read") else request.body
+
+
+def _concat(left, right):
+    left.result = [left.result, right.result]
+    return left
+
+
+def test_send_stream_body():
+    interpreter = get_interpreter_from_services(SERVICES)
+    send = send_scope(interpreter, conj_res_func=_concat)(_send)
+    # the shared stream is rewound for each endpoint
+    assert send(_request(io.BytesIO(b"image"))) == [
+        ("http://one/image/v2/images/file", b"image"),
+        ("http://two/image/v2/images/file", b"image")]
+
+
+def test_send_stream_body_concurrent():
+    interpreter = get_interpreter_from_services(SERVICES)
+    send = send_scope(interpreter, conj_res_func=_concat,
+                      conj_parallel=True)(_send)
+    with pytest.raises(ValueError):
+        send(_request(io.BytesIO(b"image")))
+
+    # bytes, or a stream sent to a single endpoint, are accepted
+    assert len(send(_request(b"image"))) == 2
+    assert send(_request(io.BytesIO(b"image"), scope="CloudTwo")) == (
+        "http://two/image/v2/images/file", b"image")
+
+
+def test_send_circuit_open():
+    interpreter = get_interpreter_from_services(SERVICES)
+    health = HealthRegistry(failure_threshold=1)
+    health.record_failure("CloudOne")
+    send = send_scope(interpreter, health=health)(Session.send)
+
+    # the endpoint is not requested, and the error is a requests one, as
+    # keystoneauth expects from 'Session.send'
+    with pytest.raises(ConnectionError) as error:
+        send(Session(), _request(b"image", scope="CloudOne"))
+    assert "CloudOne" in str(error.value)
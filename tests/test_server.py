@@ -0,0 +1,87 @@
+import argparse
+import threading
+import time
+
+import pytest
+
+from openstackoid.client.server import ServerCreateError, compute_create_scope
+from openstackoid.configuration import get_execution_scope
+
+
+class FakeApp:
+
+    def __init__(self, scope):
+        self.options = argparse.Namespace(oid_scope={"compute": scope})
+
+
+def _delete_server(command, parsed_args, result):
+    command.deleted[get_execution_scope()[1]] = dict(zip(*result))["id"]
+
+
+class FakeCreateServer:
+    """Stand-in of `openstackclient.compute.v2.server.CreateServer`."""
+
+    def __init__(self, scope, failing=()):
+        self.app = FakeApp(scope)
+        self.failing = failing
+        self.deleted = {}
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def create(self, parsed_args):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.1)
+        with self.lock:
+            self.running -= 1
+
+        cloud = get_execution_scope()[1]
+        if cloud in self.failing:
+            raise RuntimeError("No valid host was found")
+        details = {"id": f"id-{cloud}", "name": parsed_args.name}
+        if cloud == "CloudThree":
+            # as older releases of the OS client, return iterators
+            return zip(*sorted(details.items()))
+        return ("id", "name"), (f"id-{cloud}", parsed_args.name)
+
+    @compute_create_scope(None, max_concurrency=2,
+                          rollback_func=_delete_server)
+    def take_action(self, parsed_args):
+        return self.create(parsed_args)
+
+    @compute_create_scope(None, max_concurrency=2)
+    def take_action_no_rollback(self, parsed_args):
+        return self.create(parsed_args)
+
+
+def test_server_create():
+    command = FakeCreateServer("CloudOne & CloudTwo & CloudThree")
+    columns, data = command.take_action(argparse.Namespace(name="vm"))
+    assert columns == ("id", "name") * 3
+    assert data == ("id-CloudOne", "vm", "id-CloudTwo", "vm",
+                    "id-CloudThree", "vm")
+    assert command.max_running == 2
+
+
+def test_server_create_rollback():
+    command = FakeCreateServer("CloudOne & CloudTwo & CloudThree",
+                               failing=["CloudTwo"])
+    with pytest.raises(ServerCreateError) as error:
+        command.take_action(argparse.Namespace(name="vm"))
+
+    assert list(error.value.report.succeeded) == ["CloudOne", "CloudThree"]
+    assert list(error.value.report.failed) == ["CloudTwo"]
+    assert error.value.rolled_back
+    assert command.deleted == {"CloudOne": "id-CloudOne",
+                               "CloudThree": "id-CloudThree"}
+
+
+def test_server_create_no_rollback():
+    command = FakeCreateServer("CloudOne & CloudTwo", failing=["CloudOne"])
+    with pytest.raises(ServerCreateError) as error:
+        command.take_action_no_rollback(argparse.Namespace(name="vm"))
+
+    assert not error.value.rolled_back
+    assert command.deleted == {}
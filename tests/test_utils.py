@@ -0,0 +1,41 @@
+import time
+
+from openstackoid.utils import LRUCache
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("CloudOne", 1)
+    cache.set("CloudTwo", 2)
+    assert cache.get("CloudOne") == 1
+
+    # CloudTwo is the least recently used
+    cache.set("CloudThree", 3)
+    assert cache.get("CloudTwo") is None
+    assert cache.get("CloudThree") == 3
+    assert cache.stats == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1,
+                           "evictions": 1}
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("CloudOne", 1, ttl=0.01)
+    cache.set("CloudTwo", 2)
+    time.sleep(0.02)
+    assert cache.get("CloudOne", "expired") == "expired"
+    assert cache.get("CloudTwo") == 2
+    assert cache.evictions == 1
+
+
+def test_lru_cache_get_or_create():
+    cache = LRUCache()
+    created = []
+
+    def factory():
+        created.append(True)
+        return "client"
+
+    assert cache.get_or_create(("url", "CloudOne"), factory) == "client"
+    assert cache.get_or_create(("url", "CloudOne"), factory) == "client"
+    assert len(created) == 1
+    assert (cache.hits, cache.misses) == (1, 1)